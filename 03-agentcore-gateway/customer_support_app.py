@@ -3,7 +3,7 @@ from strands import Agent
 from strands.models import BedrockModel
 from strands.tools.mcp.mcp_client import MCPClient
 from streamable_http_sigv4 import streamablehttp_client_with_sigv4
-import boto3
+from aws_credentials import BackgroundRefreshingCredentials
 import os
 
 app = BedrockAgentCoreApp()
@@ -23,13 +23,17 @@ def extract_region_from_url(url: str) -> str:
         return match.group(1)
     raise ValueError(f"Could not extract region from URL: {url}")
 
+# Refreshed in the background so signing never waits on a credentials refresh
+gateway_credentials = None
+
 def create_mcp_transport(gateway_url, region):
-    session = boto3.Session()
-    credentials = session.get_credentials()
+    global gateway_credentials
+    if gateway_credentials is None:
+        gateway_credentials = BackgroundRefreshingCredentials()
     
     return streamablehttp_client_with_sigv4(
         url=gateway_url,
-        credentials=credentials,
+        credentials=gateway_credentials,
         service="bedrock-agentcore",
         region=region,
     )
@@ -36,7 +36,6 @@ class SigV4HTTPXAuth(httpx.Auth):
         self.credentials = credentials
         self.service = service
         self.region = region
-        self.signer = SigV4Auth(credentials, service, region)
 
     def auth_flow(
         self, request: httpx.Request
@@ -56,8 +55,10 @@ class SigV4HTTPXAuth(httpx.Auth):
             headers=headers,
         )
 
-        # Sign the request with SigV4
-        self.signer.add_auth(aws_request)
+        # Sign the request with SigV4, using one consistent snapshot of refreshable credentials
+        get_frozen_credentials = getattr(self.credentials, "get_frozen_credentials", None)
+        credentials = get_frozen_credentials() if get_frozen_credentials else self.credentials
+        SigV4Auth(credentials, self.service, self.region).add_auth(aws_request)
 
         # Add the signature header to the original request
         request.headers.update(dict(aws_request.headers))
@@ -0,0 +1,111 @@
+"""
+Admission control for the runtime entrypoint.
+
+Each agent request holds a model stream, the MCP session and session files
+for its whole duration, so under a burst every request slows down together.
+The AdmissionController caps how many requests run at once. Extra requests
+wait in a bounded queue up to a deadline; when the queue is full, or the
+deadline passes, they are rejected right away with a retry-after hint
+derived from the recent request duration.
+"""
+
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator
+
+from opentelemetry.metrics import CallbackOptions, Observation
+
+from telemetry import meter
+
+
+AGENT_MAX_CONCURRENCY = int(os.environ.get("AGENT_MAX_CONCURRENCY", 8))
+AGENT_MAX_QUEUE = int(os.environ.get("AGENT_MAX_QUEUE", 16))
+AGENT_QUEUE_TIMEOUT = float(os.environ.get("AGENT_QUEUE_TIMEOUT", 10))
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"Agent is busy ({reason}), retry after {retry_after:.1f}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Bounded concurrency with a bounded, deadline-aware wait queue."""
+
+    def __init__(
+        self,
+        max_concurrency: int = AGENT_MAX_CONCURRENCY,
+        max_queue: int = AGENT_MAX_QUEUE,
+        queue_timeout: float = AGENT_QUEUE_TIMEOUT,
+    ):
+        """
+        Args:
+            max_concurrency: Requests allowed to run at the same time.
+            max_queue: Requests allowed to wait for a slot, beyond that they are rejected.
+            queue_timeout: Seconds a request may wait for a slot.
+        """
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.waiting = 0
+        # Moving average of request duration, used for the retry-after hint
+        self.avg_duration = 1.0
+        self._slots = asyncio.Semaphore(max_concurrency)
+
+        self._wait_time = meter.create_histogram(
+            "agent.admission.wait", unit="ms", description="Time requests waited for a slot"
+        )
+        self._rejected = meter.create_counter("agent.admission.rejected", description="Rejected requests")
+        meter.create_observable_gauge(
+            "agent.admission.queue_depth", callbacks=[self._observe_queue_depth], description="Requests waiting"
+        )
+        meter.create_observable_gauge(
+            "agent.admission.in_flight", callbacks=[self._observe_in_flight], description="Requests running"
+        )
+
+    def _observe_queue_depth(self, options: CallbackOptions):
+        yield Observation(self.waiting)
+
+    def _observe_in_flight(self, options: CallbackOptions):
+        yield Observation(self.in_flight)
+
+    def retry_after(self) -> float:
+        """Rough time until a slot frees up for a new request."""
+        return max(1.0, self.avg_duration * (self.waiting + 1) / self.max_concurrency)
+
+    def _reject(self, reason: str):
+        self._rejected.add(1, {"reason": reason})
+        raise AdmissionRejected(reason, self.retry_after())
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncGenerator[None, None]:
+        """Hold a concurrency slot for the duration of the block."""
+        if self._slots.locked():
+            if self.waiting >= self.max_queue:
+                self._reject("queue_full")
+
+            self.waiting += 1
+            started = time.perf_counter()
+            try:
+                await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                self._reject("queue_timeout")
+            finally:
+                self.waiting -= 1
+                self._wait_time.record((time.perf_counter() - started) * 1000)
+        else:
+            await self._slots.acquire()
+            self._wait_time.record(0)
+
+        self.in_flight += 1
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self.avg_duration = 0.8 * self.avg_duration + 0.2 * (time.perf_counter() - started)
+            self._slots.release()
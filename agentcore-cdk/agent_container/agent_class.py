@@ -1,19 +1,64 @@
 from strands.models import BedrockModel
-from strands.tools.mcp.mcp_client import MCPClient
 from strands import Agent
 from uuid import uuid4
 import datetime
-from strands.session.file_session_manager import FileSessionManager
 from botocore.config import Config
 from typing import AsyncGenerator, Any
 
 import boto3
+import threading
 
 from streamable_http_sigv4 import streamablehttp_client_with_sigv4
+from aws_credentials import BackgroundRefreshingCredentials
+from tool_catalog import tool_catalog
+from mcp_connection import MCPConnectionManager, TrackedMCPClient
+from stream_projection import project_chunk
+from session_store import create_session_manager
+from phase_hooks import PhaseTimingHooks
+from tool_executor import CappedConcurrentToolExecutor
+from tool_hedging import HedgedMCPAgentTool
+from telemetry import instrument_session_manager, phase
 
 config = Config(retries={"max_attempts": 10, "mode": "adaptive"})
 today = datetime.datetime.today().strftime("%A, %B %d, %Y")
 
+# Shared so credentials and service models are resolved once per process.
+# boto3 sessions are not thread safe, clients created from them are.
+boto_session = boto3.Session()
+boto_session_lock = threading.Lock()
+
+
+gateway_credentials = None
+
+
+def get_gateway_credentials():
+    """Credentials for signing gateway requests, refreshed off the request path."""
+    global gateway_credentials
+    with boto_session_lock:
+        if gateway_credentials is None:
+            gateway_credentials = BackgroundRefreshingCredentials()
+        return gateway_credentials
+
+
+def create_model(model_id):
+    """Create the Bedrock model for an agent from the shared boto3 session."""
+    with boto_session_lock:
+        return BedrockModel(boto_session=boto_session, boto_client_config=config, model_id=model_id, max_tokens=4096)
+
+
+# BedrockModel keeps no per-conversation state, so agents share one per model id
+_models: dict[str, BedrockModel] = {}
+_models_lock = threading.Lock()
+
+
+def shared_model(model_id):
+    """The process-wide BedrockModel for model_id, built on first use (or by the pre-warm)."""
+    with _models_lock:
+        model = _models.get(model_id)
+        if model is None:
+            model = _models[model_id] = create_model(model_id)
+        return model
+
 
 def create_streamable_http_transport_sigv4(
     mcp_url: str, service_name: str, region: str
@@ -32,19 +77,46 @@ def create_streamable_http_transport_sigv4(
     Returns:
         StreamableHTTPTransportWithSigV4: A transport instance configured for SigV4 auth
     """
-    # Get AWS credentials from the current boto3 session
-    # These credentials will be used to sign requests with SigV4
-
-    session = boto3.Session()
-    credentials = session.get_credentials()
+    # AWS credentials of the shared boto3 session, as snapshots refreshed in the
+    # background so signing never waits on a credentials refresh
 
     return streamablehttp_client_with_sigv4(
         url=mcp_url,
-        credentials=credentials,  # Uses credentials from the Lambda execution role
+        credentials=get_gateway_credentials(),  # Uses credentials from the runtime execution role
         service=service_name,
         region=region,
     )
 
+
+def create_mcp_client(gatewayURL):
+    """Create an MCP client for the gateway, authenticated with SigV4."""
+    return TrackedMCPClient(
+        lambda: create_streamable_http_transport_sigv4(
+            mcp_url=gatewayURL,  # Gateway URL should be set as an environment variable
+            service_name="bedrock-agentcore",
+            region=boto3._get_default_session().region_name,  # type: ignore
+        )
+    )
+
+
+def list_gateway_tools(gatewayURL):
+    """List the tool definitions exposed by the gateway, following pagination."""
+    tools = []
+    pagination_token = None
+    mcp_client = mcp_connections.get(gatewayURL)
+    with phase("tool_listing"):
+        while True:
+            response = mcp_client.list_tools_sync(pagination_token=pagination_token)
+            tools.extend(tool.mcp_tool for tool in response)
+            if response.pagination_token is None:
+                break
+            pagination_token = response.pagination_token
+    return tools
+
+
+# One long-lived MCP session per gateway, shared by every agent in the process
+mcp_connections = MCPConnectionManager(create_mcp_client)
+
 SYSTEM_PROMPT = """
 You are an AWS Expert specializing in deep, comprehensive information gathering, analysis and guidance. Your mission is to conduct comprehensive, accurate, and up-to-date research, grounding your findings in credible web sources.
 
@@ -53,6 +125,7 @@ You are an AWS Expert specializing in deep, comprehensive information gathering,
 RULES:
 - You must start the research process by creating a plan. Think step by step about what you need to do to answer the research question.
 - You can iterate on your research plan and research response multiple times, using combinations of the tools available to you until you are satisfied with the results.
+- When you need several independent searches or page extractions, request them together in the same turn so they run in parallel.
 """
 
 
@@ -69,83 +142,60 @@ class AgentService:
         self.model_id = model_id
         self.system_prompt = system_prompt
         self.session_id = sesion_id
-        self.model = BedrockModel( boto_client_config=config, model_id=self.model_id, max_tokens=4096)
+        self.model = shared_model(self.model_id)
         self.tools = self.get_mcp_tools()
 
-        self.session_manager = FileSessionManager(session_id=self.session_id)
+        self.session_manager = instrument_session_manager(create_session_manager(self.session_id), self.model_id)
+        self.phase_hooks = PhaseTimingHooks(self.model_id)
 
         self.agent = Agent(
             model=self.model,
             tools=self.tools,
             system_prompt=SYSTEM_PROMPT,
             session_manager=self.session_manager,
+            hooks=[self.phase_hooks],
+            tool_executor=CappedConcurrentToolExecutor(),
         )
 
     def get_mcp_tools(self):
         self.mcp_client = None
         if self.gatewayURL:
 
-            # Create the MCP client with SigV4 authentication
-            self.mcp_client = MCPClient(
-                lambda: create_streamable_http_transport_sigv4(
-                    mcp_url=self.gatewayURL,  # Gateway URL should be set as an environment variable
-                    service_name="bedrock-agentcore",
-                    region=boto3._get_default_session().region_name,  # type: ignore
-                )
-            )
-
-            with self.mcp_client:
-                return self.mcp_client.list_tools_sync()
+            # Shared MCP client with SigV4 authentication, kept open across invocations
+            self.mcp_client = mcp_connections.get(self.gatewayURL)
+
+            # Tool definitions come from the shared catalog, bound to this client
+            mcp_tools = tool_catalog.get(self.gatewayURL, lambda: list_gateway_tools(self.gatewayURL))
+            return [HedgedMCPAgentTool(mcp_tool, self.mcp_client) for mcp_tool in mcp_tools]
         else:
             return []
 
+    def close(self):
+        """Write any session records still queued by the session store."""
+        flush = getattr(self.session_manager.session_repository, "flush", None)
+        if flush:
+            flush()
+
     def invoke(self, query):
-        if self.mcp_client:
-            with self.mcp_client:
-                return self.agent(query)
-        else:
-            return self.agent(query)
+        return self.agent(query)
 
-    async def invoke_async(self, query) -> AsyncGenerator[Any, None]:
+    async def invoke_async(self, query, deadline: float | None = None) -> AsyncGenerator[Any, None]:
+        """
+        Args:
+            query: The user message.
+            deadline: time.monotonic() by which the invocation should finish; tool calls are bounded by it.
+        """
 
         if self.mcp_client:
-            with self.mcp_client:
-                agent_stream = self.agent.stream_async(query)
-                async for chunk in agent_stream:  # ignore
-                    if "agent" in chunk:
-                        del chunk["agent"]
-                    if "event_loop_cycle_id" in chunk:
-                        del chunk["event_loop_cycle_id"]
-                    if "event_loop_parent_cycle_id" in chunk:
-                        del chunk["event_loop_parent_cycle_id"]
-                    if "system_prompt" in chunk:
-                        del chunk["system_prompt"]
-                    if "model" in chunk:
-                        del chunk["model"]
-                    if "event_loop_cycle_trace" in chunk:
-                        del chunk["event_loop_cycle_trace"]
-                    if "event_loop_cycle_span" in chunk:
-                        del chunk["event_loop_cycle_span"]
-                    if "messages" in chunk:
-                        del chunk["messages"]
-                    if "tool_config" in chunk:
-                        del chunk["tool_config"]
-
-                    if chunk.get("delta", {}).get("toolUse"):
-                        continue
-                    if chunk.get("contentBlockDelta", {}).get("delta", {}).get("toolUse"):
-                        continue
-                    if (
-                        chunk.get("event", {})
-                        .get("contentBlockDelta", {})
-                        .get("delta", {})
-                        .get("toolUse")
-                    ):
-                        continue
-
-                    yield chunk
+            agent_stream = self.agent.stream_async(query, invocation_state={"deadline": deadline})
+            async for chunk in agent_stream:  # ignore
+                self.phase_hooks.on_stream_chunk(chunk)
+                projected = project_chunk(chunk)
+                if projected is not None:
+                    yield projected
 
         else:
-            agent_stream = self.agent.stream_async(query)
+            agent_stream = self.agent.stream_async(query, invocation_state={"deadline": deadline})
             async for chunk in agent_stream:
+                self.phase_hooks.on_stream_chunk(chunk)
                 yield chunk
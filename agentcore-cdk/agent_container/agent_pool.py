@@ -0,0 +1,128 @@
+"""
+Process-wide pool of AgentService instances keyed by session id.
+
+Building an AgentService creates a BedrockModel, lists the gateway tools and
+reloads the session history, so warm sessions reuse the instance built on
+their first request. Entries are evicted least-recently-used first when the
+pool is full, when they have been idle longer than the TTL, or when the
+process resident memory goes over the configured cap.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncGenerator, Callable
+
+
+AGENT_POOL_MAX_SIZE = int(os.environ.get("AGENT_POOL_MAX_SIZE", 32))
+AGENT_POOL_IDLE_TTL = float(os.environ.get("AGENT_POOL_IDLE_TTL", 900))
+AGENT_POOL_MAX_MEMORY_MB = float(os.environ.get("AGENT_POOL_MAX_MEMORY_MB", 0))
+
+
+def current_rss_mb() -> float:
+    """Return the resident set size of this process in MB (0 if unknown)."""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+class _PoolEntry:
+    def __init__(self):
+        self.agent = None
+        self.lock = asyncio.Lock()
+        self.last_used = time.monotonic()
+
+
+class AgentPool:
+    """LRU + idle-TTL pool of agents, one per session id."""
+
+    def __init__(
+        self,
+        factory: Callable[[str], Any],
+        max_size: int = AGENT_POOL_MAX_SIZE,
+        idle_ttl: float = AGENT_POOL_IDLE_TTL,
+        max_memory_mb: float = AGENT_POOL_MAX_MEMORY_MB,
+    ):
+        """
+        Args:
+            factory: Builds a new agent for the given session id.
+            max_size: Maximum number of pooled sessions.
+            idle_ttl: Seconds a session may stay unused before it is evicted.
+            max_memory_mb: Resident memory cap in MB, 0 disables the check.
+        """
+        self.factory = factory
+        self.max_size = max_size
+        self.idle_ttl = idle_ttl
+        self.max_memory_mb = max_memory_mb
+        self._entries: OrderedDict[str, _PoolEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, session_id):
+        entry = self._entries.get(session_id)
+        return entry is not None and entry.agent is not None
+
+    @asynccontextmanager
+    async def lease(self, session_id: str | None) -> AsyncGenerator[Any, None]:
+        """
+        Borrow the agent for a session, building it on first use.
+
+        Requests for the same session are serialized so a single agent never
+        runs two turns at once. Sessions without an id get a one-off agent.
+        """
+        if not session_id:
+            yield await asyncio.to_thread(self.factory, session_id)
+            return
+
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                entry = self._entries[session_id] = _PoolEntry()
+            self._entries.move_to_end(session_id)
+
+        async with entry.lock:
+            if entry.agent is None:
+                print(f"Agent pool miss for session {session_id}")
+                entry.agent = await asyncio.to_thread(self.factory, session_id)
+            try:
+                yield entry.agent
+            finally:
+                entry.last_used = time.monotonic()
+                self.evict_expired()
+
+    def evict(self, session_id: str) -> bool:
+        """Drop a session from the pool. Returns False if it is in use."""
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None or entry.lock.locked():
+                return False
+            del self._entries[session_id]
+        close = getattr(entry.agent, "close", None)
+        if close:
+            close()
+        return True
+
+    def evict_expired(self):
+        """Apply the idle TTL, size and memory limits to the pool."""
+        now = time.monotonic()
+        for session_id, entry in list(self._entries.items()):
+            if now - entry.last_used > self.idle_ttl:
+                self.evict(session_id)
+
+        # Least recently used entries are at the front of the OrderedDict
+        for session_id in list(self._entries)[: max(0, len(self._entries) - self.max_size)]:
+            self.evict(session_id)
+
+        if self.max_memory_mb and current_rss_mb() > self.max_memory_mb:
+            # RSS does not shrink right away, so shed half of the pool at once
+            # instead of emptying it one request at a time.
+            for session_id in list(self._entries)[: len(self._entries) // 2]:
+                self.evict(session_id)
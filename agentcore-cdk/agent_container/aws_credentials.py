@@ -0,0 +1,117 @@
+"""
+Non-blocking AWS credentials for request signing.
+
+botocore's RefreshableCredentials refresh themselves lazily, on the first
+read that falls inside the refresh window, so with role or container
+credentials a SigV4 signature in the middle of an MCP stream can end up
+waiting on an STS or metadata-endpoint call on the event loop.
+
+BackgroundRefreshingCredentials hands the signer an immutable snapshot and
+owns the refresh schedule: a background thread checks expiry every
+CREDENTIALS_CHECK_INTERVAL seconds and, CREDENTIALS_REFRESH_AHEAD seconds
+before it, resolves new credentials from the credential chain, so reading
+credentials never blocks. Only public botocore APIs are used: refresh_needed
+for the schedule and get_frozen_credentials for the snapshot. If a refresh
+fails the previous snapshot is kept and the refresh is retried on the next
+check. Refresh
+latency is recorded in the `aws.credentials.refresh.duration` histogram.
+"""
+
+import os
+import threading
+import time
+from typing import Callable
+
+import boto3
+from botocore.credentials import Credentials, ReadOnlyCredentials
+from opentelemetry import metrics
+
+
+# botocore starts refreshing 15 minutes before expiry (advisory window)
+CREDENTIALS_REFRESH_AHEAD = float(os.environ.get("CREDENTIALS_REFRESH_AHEAD", 900))
+CREDENTIALS_CHECK_INTERVAL = float(os.environ.get("CREDENTIALS_CHECK_INTERVAL", 30))
+
+meter = metrics.get_meter(__name__)
+refresh_duration = meter.create_histogram(
+    "aws.credentials.refresh.duration", unit="ms", description="Time spent refreshing AWS credentials"
+)
+
+
+def resolve_credentials() -> Credentials:
+    """Credentials from the default chain; a new session resolves them again instead of reusing cached ones."""
+    return boto3.Session().get_credentials()
+
+
+class BackgroundRefreshingCredentials:
+    """Frozen credentials snapshot kept fresh by a background thread."""
+
+    def __init__(
+        self,
+        load_credentials: Callable[[], Credentials] = resolve_credentials,
+        refresh_ahead: float = CREDENTIALS_REFRESH_AHEAD,
+        check_interval: float = CREDENTIALS_CHECK_INTERVAL,
+    ):
+        """
+        Args:
+            load_credentials: Returns newly resolved botocore credentials, called once here
+                              and again for each refresh.
+            refresh_ahead: Seconds before expiry to refresh the snapshot.
+            check_interval: Seconds between expiry checks of the background thread.
+        """
+        self.load_credentials = load_credentials
+        self.credentials = load_credentials()
+        self.refresh_ahead = refresh_ahead
+        self.check_interval = check_interval
+        self.refreshes = 0
+        self.failed_refreshes = 0
+        self._snapshot = self.credentials.get_frozen_credentials()
+        self._stop = threading.Event()
+        self._thread = None
+        # Static credentials never expire, there is nothing to refresh
+        if hasattr(self.credentials, "refresh_needed"):
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def get_frozen_credentials(self) -> ReadOnlyCredentials:
+        """The current snapshot, without any I/O."""
+        return self._snapshot
+
+    @property
+    def access_key(self) -> str:
+        return self._snapshot.access_key
+
+    @property
+    def secret_key(self) -> str:
+        return self._snapshot.secret_key
+
+    @property
+    def token(self) -> str | None:
+        return self._snapshot.token
+
+    def refresh(self):
+        """Resolve new credentials and swap in their snapshot."""
+        started = time.perf_counter()
+        try:
+            # Resolved again rather than refreshed in place: botocore only refreshes
+            # inside its own advisory window, which may be shorter than refresh_ahead
+            credentials = self.load_credentials()
+            snapshot = credentials.get_frozen_credentials()
+        except Exception as e:
+            self.failed_refreshes += 1
+            refresh_duration.record((time.perf_counter() - started) * 1000, {"outcome": "error"})
+            print(f"AWS credentials refresh failed, keeping the current ones: {e}")
+            return
+        refresh_duration.record((time.perf_counter() - started) * 1000, {"outcome": "ok"})
+        self.credentials = credentials
+        if snapshot != self._snapshot:
+            self.refreshes += 1
+            self._snapshot = snapshot
+
+    def close(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.check_interval):
+            refresh_needed = getattr(self.credentials, "refresh_needed", None)
+            if refresh_needed is not None and refresh_needed(self.refresh_ahead):
+                self.refresh()
@@ -0,0 +1,276 @@
+"""
+Long-lived MCP connections shared by every agent in the process.
+
+Starting an MCPClient runs the streamable-HTTP handshake, so instead of
+opening and closing a session around every invocation the manager keeps one
+started client per gateway URL. A daemon thread probes each connection
+periodically with a tools/list request (MCPClient.list_tools_sync). A
+session that has ended is reconnected at once; a live one only after
+MCP_HEALTH_CHECK_FAILURES probes in a row failed, and once the
+tool calls in flight on it have finished (or MCP_DRAIN_TIMEOUT has passed),
+so one transient failure does not cut off other agents' calls. Reconnects
+retry with exponential backoff. The same MCPClient object is restarted in
+place, so tools already bound to it keep working after a reconnect.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from strands.tools.mcp.mcp_client import MCPClient
+from strands.types.exceptions import MCPClientInitializationError
+
+from telemetry import phase
+
+
+MCP_HEALTH_CHECK_INTERVAL = float(os.environ.get("MCP_HEALTH_CHECK_INTERVAL", 30))
+MCP_RECONNECT_MAX_BACKOFF = float(os.environ.get("MCP_RECONNECT_MAX_BACKOFF", 30))
+MCP_HEALTH_CHECK_FAILURES = int(os.environ.get("MCP_HEALTH_CHECK_FAILURES", 3))
+MCP_HEALTH_CHECK_TIMEOUT = float(os.environ.get("MCP_HEALTH_CHECK_TIMEOUT", 10))
+MCP_DRAIN_TIMEOUT = float(os.environ.get("MCP_DRAIN_TIMEOUT", 30))
+PAUSE_POLL_INTERVAL = 0.05
+
+
+class TrackedMCPClient(MCPClient):
+    """
+    MCPClient that counts its tool calls in flight and can be drained.
+
+    While paused (the session is being drained and restarted), new tool calls
+    wait for it to resume, at most MCP_DRAIN_TIMEOUT, instead of being sent
+    on a session about to be stopped.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._in_flight = 0
+        self._paused = False
+        self._idle = threading.Condition()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _begin_call(self) -> bool:
+        with self._idle:
+            if self._paused:
+                return False
+            self._in_flight += 1
+            return True
+
+    def _end_call(self):
+        with self._idle:
+            self._in_flight -= 1
+            self._idle.notify_all()
+
+    def pause(self):
+        with self._idle:
+            self._paused = True
+
+    def resume(self):
+        with self._idle:
+            self._paused = False
+            self._idle.notify_all()
+
+    def call_tool_sync(self, *args, **kwargs):
+        with self._idle:
+            self._idle.wait_for(lambda: not self._paused, MCP_DRAIN_TIMEOUT)
+            self._in_flight += 1
+        try:
+            return super().call_tool_sync(*args, **kwargs)
+        finally:
+            self._end_call()
+
+    async def call_tool_async(self, *args, **kwargs):
+        # Poll, blocking on the condition would stall the agent's event loop
+        waited = 0.0
+        while not self._begin_call():
+            if waited >= MCP_DRAIN_TIMEOUT:
+                with self._idle:
+                    self._in_flight += 1
+                break
+            await asyncio.sleep(PAUSE_POLL_INTERVAL)
+            waited += PAUSE_POLL_INTERVAL
+        try:
+            return await super().call_tool_async(*args, **kwargs)
+        finally:
+            self._end_call()
+
+    def wait_idle(self, timeout: float) -> bool:
+        """Wait until no tool call is in flight; False if some still are after timeout."""
+        with self._idle:
+            return self._idle.wait_for(lambda: not self._in_flight, timeout)
+
+
+class MCPConnectionStats:
+    def __init__(self):
+        self.connects = 0
+        self.reconnects = 0
+        self.failed_health_checks = 0
+        self.drain_timeouts = 0
+        self.handshake_seconds_total = 0.0
+        self.last_handshake_seconds = 0.0
+
+    def as_dict(self) -> dict:
+        return dict(self.__dict__)
+
+
+class MCPConnectionManager:
+    """Keeps one started MCPClient per gateway URL and heals it when it drops."""
+
+    def __init__(
+        self,
+        client_factory: Callable[[str], MCPClient],
+        health_check_interval: float = MCP_HEALTH_CHECK_INTERVAL,
+        max_backoff: float = MCP_RECONNECT_MAX_BACKOFF,
+        max_failures: int = MCP_HEALTH_CHECK_FAILURES,
+        drain_timeout: float = MCP_DRAIN_TIMEOUT,
+        health_check_timeout: float = MCP_HEALTH_CHECK_TIMEOUT,
+    ):
+        """
+        Args:
+            client_factory: Builds a (not yet started) MCPClient for a gateway URL,
+                            preferably a TrackedMCPClient.
+            health_check_interval: Seconds between health probes, 0 disables them.
+            max_backoff: Upper bound in seconds for the reconnect backoff.
+            max_failures: Failed probes in a row before a live session is restarted.
+            drain_timeout: Seconds to wait for calls in flight before restarting a live session.
+            health_check_timeout: Seconds a health probe may take before it counts as failed.
+        """
+        self.client_factory = client_factory
+        self.health_check_interval = health_check_interval
+        self.max_backoff = max_backoff
+        self.max_failures = max_failures
+        self.drain_timeout = drain_timeout
+        self.health_check_timeout = health_check_timeout
+        self._failures: dict[str, int] = {}
+        self.stats = MCPConnectionStats()
+        self._clients: dict[str, MCPClient] = {}
+        self._locks: dict[str, threading.Lock] = {}
+        self._connected_urls: set[str] = set()
+        # URLs whose client was started and has not been seen ending since
+        self._running: set[str] = set()
+        # list_tools_sync has no timeout, probes run here so a stuck one cannot block the health thread
+        self._probes = ThreadPoolExecutor(max_workers=2, thread_name_prefix="mcp-health-probe")
+        self._lock = threading.Lock()
+        self._health_thread = None
+        self._stopped = threading.Event()
+
+    def get(self, url: str) -> MCPClient:
+        """Return the started client for `url`, connecting it if needed."""
+        with self._lock:
+            client = self._clients.get(url)
+            if client is None:
+                client = self._clients[url] = self.client_factory(url)
+                self._locks[url] = threading.Lock()
+            self._start_health_thread()
+
+        if url not in self._running:
+            self._connect(url, client)
+        return client
+
+    def close_all(self):
+        self._stopped.set()
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+            self._running.clear()
+        for client in clients:
+            self._stop_client(client)
+        self._probes.shutdown(wait=False, cancel_futures=True)
+
+    def _connect(self, url: str, client: MCPClient, force: bool = False):
+        with self._locks[url]:
+            # Another thread may have reconnected while we waited for the lock
+            if not force and url in self._running:
+                return
+
+            reconnect = url in self._connected_urls
+            backoff = min(0.5, self.max_backoff)
+            while True:
+                self._running.discard(url)
+                self._stop_client(client)
+                started = time.perf_counter()
+                try:
+                    with phase("mcp_handshake"):
+                        client.start()
+                except Exception as e:
+                    # Only the health thread keeps retrying, callers fail fast
+                    if self._stopped.is_set() or not force:
+                        raise
+                    print(f"MCP reconnect to {url} failed, retrying in {backoff}s: {e}")
+                    time.sleep(backoff)
+                    backoff = min(backoff * 2, self.max_backoff)
+                    continue
+
+                elapsed = time.perf_counter() - started
+                self._running.add(url)
+                self._connected_urls.add(url)
+                self.stats.connects += 1
+                self.stats.reconnects += int(reconnect)
+                self.stats.handshake_seconds_total += elapsed
+                self.stats.last_handshake_seconds = elapsed
+                print(f"MCP session to {url} ready in {elapsed * 1000:.0f} ms")
+                return
+
+    def _stop_client(self, client: MCPClient):
+        try:
+            client.stop(None, None, None)
+        except Exception as e:
+            print(f"Ignoring error while stopping MCP client: {e}")
+
+    def _start_health_thread(self):
+        if self._health_thread is not None or self.health_check_interval <= 0:
+            return
+        self._health_thread = threading.Thread(target=self._health_loop, daemon=True)
+        self._health_thread.start()
+
+    def _health_loop(self):
+        while not self._stopped.wait(self.health_check_interval):
+            for url, client in list(self._clients.items()):
+                if url in self._running:
+                    if self._is_healthy(url, client):
+                        self._failures[url] = 0
+                        continue
+                    self.stats.failed_health_checks += 1
+                    self._failures[url] = self._failures.get(url, 0) + 1
+                    # A session found ended is reconnected without waiting for more failures
+                    if url in self._running and self._failures[url] < self.max_failures:
+                        continue
+                pause = getattr(client, "pause", None)
+                if pause is not None:
+                    pause()
+                try:
+                    self._drain(url, client)
+                    self._connect(url, client, force=True)
+                    self._failures[url] = 0
+                except Exception as e:
+                    print(f"MCP health check could not reconnect {url}: {e}")
+                finally:
+                    if pause is not None:
+                        client.resume()
+
+    def _drain(self, url: str, client: MCPClient):
+        """Let the tool calls in flight on a session finish before it is restarted."""
+        if url not in self._running:
+            return
+        wait_idle = getattr(client, "wait_idle", None)
+        if wait_idle is None or wait_idle(self.drain_timeout):
+            return
+        self.stats.drain_timeouts += 1
+        print(f"MCP session to {url} still has {client.in_flight} calls in flight, restarting it anyway")
+
+    def _is_healthy(self, url: str, client: MCPClient) -> bool:
+        try:
+            self._probes.submit(client.list_tools_sync).result(self.health_check_timeout)
+            return True
+        except MCPClientInitializationError as e:
+            # Raised when the client session is no longer running
+            self._running.discard(url)
+            print(f"MCP session to {url} has ended: {e}")
+            return False
+        except Exception as e:
+            print(f"MCP health check failed: {e!r}")
+            return False
@@ -0,0 +1,73 @@
+"""
+Strands hooks feeding the per-phase latency instrumentation in telemetry.py
+with model calls, model time-to-first-token and tool calls.
+"""
+
+import time
+
+from strands.hooks import (
+    AfterModelCallEvent,
+    AfterToolCallEvent,
+    BeforeModelCallEvent,
+    BeforeToolCallEvent,
+    HookProvider,
+    HookRegistry,
+)
+
+from telemetry import record_phase, tracer
+
+
+class PhaseTimingHooks(HookProvider):
+    def __init__(self, model_id: str):
+        self.model_id = model_id
+        self._model_call = None
+        self._waiting_first_token = False
+        self._tool_calls = {}
+
+    def register_hooks(self, registry: HookRegistry, **kwargs) -> None:
+        registry.add_callback(BeforeModelCallEvent, self.before_model_call)
+        registry.add_callback(AfterModelCallEvent, self.after_model_call)
+        registry.add_callback(BeforeToolCallEvent, self.before_tool_call)
+        registry.add_callback(AfterToolCallEvent, self.after_tool_call)
+
+    def before_model_call(self, event: BeforeModelCallEvent) -> None:
+        span = tracer.start_span("agent.model_call", attributes={"model_id": self.model_id})
+        self._model_call = (span, time.perf_counter())
+        self._waiting_first_token = True
+
+    def after_model_call(self, event: AfterModelCallEvent) -> None:
+        if self._model_call is None:
+            return
+        span, started = self._model_call
+        self._model_call = None
+        span.end()
+        record_phase("model_call", started, time.perf_counter() - started, model_id=self.model_id)
+
+    def on_stream_chunk(self, chunk: dict) -> None:
+        """Called for every streamed chunk to catch the first model token."""
+        if self._waiting_first_token and "delta" in chunk and self._model_call is not None:
+            self._waiting_first_token = False
+            started = self._model_call[1]
+            record_phase("model_ttft", started, time.perf_counter() - started, model_id=self.model_id)
+
+    def before_tool_call(self, event: BeforeToolCallEvent) -> None:
+        tool_name = event.tool_use["name"]
+        span = tracer.start_span("agent.tool_call", attributes={"model_id": self.model_id, "tool_name": tool_name})
+        self._tool_calls[event.tool_use["toolUseId"]] = (span, time.perf_counter())
+
+    def after_tool_call(self, event: AfterToolCallEvent) -> None:
+        tool_call = self._tool_calls.pop(event.tool_use["toolUseId"], None)
+        if tool_call is None:
+            return
+        span, started = tool_call
+        status = event.result.get("status") if event.result else None
+        span.set_attribute("status", status or "unknown")
+        span.end()
+        record_phase(
+            "tool_call",
+            started,
+            time.perf_counter() - started,
+            model_id=self.model_id,
+            tool_name=event.tool_use["name"],
+            status=status,
+        )
@@ -1,7 +1,12 @@
 from bedrock_agentcore.runtime import BedrockAgentCoreApp # type: ignore
 import logging
 import os
-from agent_class import AgentService
+import time
+from admission import AdmissionController, AdmissionRejected
+from agent_pool import AgentPool
+from stream_coalescer import STREAM_COALESCE_MS, coalesce_deltas
+from startup import AGENT_PREWARM, Prewarmer, prewarm_steps
+from telemetry import phase, request_waterfall
 
 
 app = BedrockAgentCoreApp()
@@ -9,6 +14,8 @@ app.logger.setLevel(logging.ERROR)
 
 GATEWAY_URL = os.environ.get("GATEWAY_URL")
 MODEL_ID = os.environ.get("MODEL_ID", "global.anthropic.claude-haiku-4-5-20251001-v1:0")
+# Seconds an invocation may take from arrival; tool calls are not started past it
+AGENT_INVOCATION_BUDGET = float(os.environ.get("AGENT_INVOCATION_BUDGET", 300))
 
 
 SYSTEM_PROMPT = """
@@ -19,9 +26,26 @@ You are an AWS Expert specializing in deep, comprehensive information gathering,
 RULES:
 - You must start the research process by creating a plan. Think step by step about what you need to do to answer the research question.
 - You can iterate on your research plan and research response multiple times, using combinations of the tools available to you until you are satisfied with the results.
+- When you need several independent searches or page extractions, request them together in the same turn so they run in parallel.
 """
 
 
+def create_agent(session_id):
+    # Imported here so the server starts before strands, boto3 and mcp are loaded
+    from agent_class import AgentService
+
+    with phase("agent_setup", model_id=MODEL_ID):
+        return AgentService(gatewayURL=GATEWAY_URL, model_id=MODEL_ID, sesion_id=session_id)
+
+
+agent_pool = AgentPool(create_agent)
+admission = AdmissionController()
+
+prewarmer = Prewarmer(prewarm_steps(GATEWAY_URL, MODEL_ID))
+if AGENT_PREWARM:
+    prewarmer.start()
+
+
 @app.entrypoint
 async def strands_agent_bedrock_streaming(payload, context):
     """
@@ -29,6 +53,7 @@ async def strands_agent_bedrock_streaming(payload, context):
     This function demonstrates how to implement streaming responses
     with AgentCore Runtime using async generators
     """
+    deadline = time.monotonic() + AGENT_INVOCATION_BUDGET
     print("payload", payload)
     user_input = payload.get("prompt")
 
@@ -38,22 +63,36 @@ async def strands_agent_bedrock_streaming(payload, context):
     print("Model ID:", MODEL_ID)
 
 
-    print("Initializing Agent Now:")
-    agent = AgentService( gatewayURL=GATEWAY_URL, model_id=MODEL_ID, sesion_id=context.session_id)
-
-
-    print("Invoking Agent Now:")
-
-    try:
-        agent_stream = agent.invoke_async([{"text": user_input}])
-        async for chunk in agent_stream:  # ignore
-            yield chunk
-
-    except Exception as e:
-        # Handle errors gracefully in streaming context
-        error_response = {"error": str(e), "type": "stream_error"}
-        print(f"Streaming error: {error_response}")
-        yield error_response
+    with request_waterfall(context.session_id, MODEL_ID):
+        try:
+            async with admission.admit():
+                if not prewarmer.ready:
+                    with phase("prewarm_wait"):
+                        if not await prewarmer.wait_ready():
+                            print("Pre-warm still running, continuing without it")
+
+                print("Getting Agent from pool:", len(agent_pool), "sessions pooled")
+
+                try:
+                    async with agent_pool.lease(context.session_id) as agent:
+                        print("Invoking Agent Now:")
+                        agent_stream = agent.invoke_async([{"text": user_input}], deadline=deadline)
+                        if STREAM_COALESCE_MS > 0:
+                            agent_stream = coalesce_deltas(agent_stream)
+                        async for chunk in agent_stream:  # ignore
+                            yield chunk
+
+                except Exception as e:
+                    # Handle errors gracefully in streaming context
+                    error_response = {"error": str(e), "type": "stream_error"}
+                    print(f"Streaming error: {error_response}")
+                    yield error_response
+
+        except AdmissionRejected as e:
+            # Saturated: tell the client when to come back instead of queueing forever
+            error_response = {"error": str(e), "type": "throttled", "retry_after": round(e.retry_after, 1)}
+            print(f"Rejected request: {error_response}")
+            yield error_response
 
 if __name__ == "__main__":
     app.run()
@@ -0,0 +1,304 @@
+"""
+Append-only, write-behind session storage for strands agents.
+
+FileSessionManager rewrites one JSON file per message and agent update
+synchronously and reads every message file back when a session is loaded.
+AppendLogSessionRepository keeps one log file per session instead:
+
+- every create/update is a single line appended to the log, queued in memory
+  and written by a background thread in batches, off the request path;
+- on load only a line index is built, message bodies are decoded lazily and
+  only for the tail the conversation manager asks for;
+- once the log holds more superseded than live records it is compacted into
+  a fresh file with the latest version of each record.
+
+Writes are batched every SESSION_FLUSH_INTERVAL seconds, so a crash can lose
+at most that window. `flush()` forces pending records to disk.
+"""
+
+import atexit
+import dataclasses
+import json
+import os
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from strands.session.file_session_manager import FileSessionManager
+from strands.session.repository_session_manager import RepositorySessionManager
+from strands.session.session_repository import SessionRepository
+from strands.types.exceptions import SessionException
+from strands.types.session import Session, SessionAgent, SessionMessage, decode_bytes_values
+
+if TYPE_CHECKING:
+    from strands.multiagent.base import MultiAgentBase
+
+
+SESSION_STORE = os.environ.get("SESSION_STORE", "log")
+SESSION_STORAGE_DIR = os.environ.get("SESSION_STORAGE_DIR", str(Path.home() / ".strands" / "session_logs"))
+SESSION_FLUSH_INTERVAL = float(os.environ.get("SESSION_FLUSH_INTERVAL", 0.05))
+SESSION_COMPACT_MIN_RECORDS = int(os.environ.get("SESSION_COMPACT_MIN_RECORDS", 256))
+
+# Record kinds, first field of every log line: <kind>\t<agent_id>\t<message_id>\t<json>
+SESSION_RECORD = "S"
+AGENT_RECORD = "A"
+MESSAGE_RECORD = "M"
+MULTI_AGENT_RECORD = "X"
+
+_MESSAGE_FIELDS = frozenset(f.name for f in dataclasses.fields(SessionMessage))
+
+
+def _decode_message(data: str) -> SessionMessage:
+    """SessionMessage.from_dict without the per-key inspect.signature() calls."""
+    env = json.loads(data)
+    return SessionMessage(**decode_bytes_values({k: v for k, v in env.items() if k in _MESSAGE_FIELDS}))
+
+
+class _LogWriter:
+    """Single background thread that appends queued records for every session."""
+
+    def __init__(self, flush_interval: float):
+        self.flush_interval = flush_interval
+        self._dirty: set["_SessionLog"] = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def schedule(self, log: "_SessionLog"):
+        with self._lock:
+            self._dirty.add(log)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def flush_all(self):
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+        for log in dirty:
+            try:
+                log.flush()
+            except OSError as e:
+                print(f"Session log flush failed for {log.path}: {e}")
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self.flush_all()
+
+
+_writer = _LogWriter(SESSION_FLUSH_INTERVAL)
+atexit.register(_writer.flush_all)
+
+
+class _SessionLog:
+    """In-memory index of one session log plus the records waiting to be written."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.session: str | None = None
+        self.agents: dict[str, str] = {}
+        self.multi_agents: dict[str, str] = {}
+        self.messages: dict[str, dict[int, str]] = {}
+        self.records = 0
+        self._pending: list[str] = []
+        self._lock = threading.RLock()
+        if os.path.exists(path):
+            self._index()
+
+    def _index(self):
+        with open(self.path, "rb+") as f:
+            complete = 0
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Torn write from a crash in the middle of a batch: cut it off, or the
+                    # next append would be glued onto it
+                    print(f"Dropping a torn record at the end of {self.path}")
+                    f.truncate(complete)
+                    break
+                self._apply(line.decode("utf-8"))
+                complete += len(line)
+
+    def _apply(self, line: str):
+        kind, agent_id, message_id, payload = line.rstrip("\n").split("\t", 3)
+        if kind == SESSION_RECORD:
+            self.session = payload
+        elif kind == AGENT_RECORD:
+            self.agents[agent_id] = payload
+        elif kind == MULTI_AGENT_RECORD:
+            self.multi_agents[agent_id] = payload
+        elif kind == MESSAGE_RECORD:
+            self.messages.setdefault(agent_id, {})[int(message_id)] = payload
+        self.records += 1
+
+    def append(self, kind: str, data: dict, agent_id: str = "", message_id: int = 0):
+        line = f"{kind}\t{agent_id}\t{message_id}\t{json.dumps(data, ensure_ascii=False)}\n"
+        with self._lock:
+            self._apply(line)
+            self._pending.append(line)
+        _writer.schedule(self)
+
+    def live_records(self) -> int:
+        return (
+            int(self.session is not None)
+            + len(self.agents)
+            + len(self.multi_agents)
+            + sum(len(messages) for messages in self.messages.values())
+        )
+
+    def flush(self):
+        with self._lock:
+            if not self._pending:
+                return
+            lines, self._pending = self._pending, []
+            os.makedirs(os.path.dirname(self.path), mode=0o700, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("".join(lines))
+            if self.records >= SESSION_COMPACT_MIN_RECORDS and self.records > 2 * self.live_records():
+                self.compact()
+
+    def compact(self):
+        """Rewrite the log with only the latest version of every record."""
+        with self._lock:
+            lines = []
+            if self.session is not None:
+                lines.append(f"{SESSION_RECORD}\t\t0\t{self.session}\n")
+            lines += [f"{AGENT_RECORD}\t{agent_id}\t0\t{data}\n" for agent_id, data in self.agents.items()]
+            lines += [f"{MULTI_AGENT_RECORD}\t{ma_id}\t0\t{data}\n" for ma_id, data in self.multi_agents.items()]
+            for agent_id, messages in self.messages.items():
+                lines += [
+                    f"{MESSAGE_RECORD}\t{agent_id}\t{message_id}\t{messages[message_id]}\n"
+                    for message_id in sorted(messages)
+                ]
+            tmp_path = f"{self.path}.compact"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                # Pending records are already in the index, so in lines
+                f.write("".join(lines))
+            os.replace(tmp_path, self.path)
+            self._pending = []
+            self.records = len(lines)
+
+
+class AppendLogSessionRepository(SessionRepository):
+    """SessionRepository storing each session as an append-only log file."""
+
+    def __init__(self, storage_dir: str = SESSION_STORAGE_DIR):
+        self.storage_dir = storage_dir
+        self._logs: dict[str, _SessionLog] = {}
+        self._lock = threading.Lock()
+
+    def _log(self, session_id: str) -> _SessionLog:
+        with self._lock:
+            log = self._logs.get(session_id)
+            if log is None:
+                if not session_id or os.path.basename(session_id) != session_id:
+                    raise SessionException(f"Invalid session id: {session_id!r}")
+                path = os.path.join(self.storage_dir, f"session_{session_id}.log")
+                # Another repository in this process may still hold records for this session
+                _writer.flush_all()
+                log = self._logs[session_id] = _SessionLog(path)
+            return log
+
+    def flush(self):
+        """Write every pending record of this repository to disk."""
+        for log in list(self._logs.values()):
+            log.flush()
+
+    def create_session(self, session: Session, **kwargs: Any) -> Session:
+        log = self._log(session.session_id)
+        if log.session is not None:
+            raise SessionException(f"Session {session.session_id} already exists")
+        log.append(SESSION_RECORD, session.to_dict())
+        return session
+
+    def read_session(self, session_id: str, **kwargs: Any) -> Session | None:
+        log = self._log(session_id)
+        if log.session is None:
+            return None
+        return Session.from_dict(json.loads(log.session))
+
+    def delete_session(self, session_id: str, **kwargs: Any) -> None:
+        log = self._log(session_id)
+        if log.session is None:
+            raise SessionException(f"Session {session_id} does not exist")
+        with log._lock:
+            log._pending = []
+            if os.path.exists(log.path):
+                os.remove(log.path)
+        with self._lock:
+            self._logs.pop(session_id, None)
+
+    def create_agent(self, session_id: str, session_agent: SessionAgent, **kwargs: Any) -> None:
+        self._log(session_id).append(AGENT_RECORD, session_agent.to_dict(), session_agent.agent_id)
+
+    def read_agent(self, session_id: str, agent_id: str, **kwargs: Any) -> SessionAgent | None:
+        data = self._log(session_id).agents.get(agent_id)
+        if data is None:
+            return None
+        return SessionAgent.from_dict(json.loads(data))
+
+    def update_agent(self, session_id: str, session_agent: SessionAgent, **kwargs: Any) -> None:
+        previous_agent = self.read_agent(session_id, session_agent.agent_id)
+        if previous_agent is None:
+            raise SessionException(f"Agent {session_agent.agent_id} in session {session_id} does not exist")
+        session_agent.created_at = previous_agent.created_at
+        self.create_agent(session_id, session_agent)
+
+    def create_message(self, session_id: str, agent_id: str, session_message: SessionMessage, **kwargs: Any) -> None:
+        self._log(session_id).append(
+            MESSAGE_RECORD, session_message.to_dict(), agent_id, session_message.message_id
+        )
+
+    def read_message(self, session_id: str, agent_id: str, message_id: int, **kwargs: Any) -> SessionMessage | None:
+        data = self._log(session_id).messages.get(agent_id, {}).get(message_id)
+        if data is None:
+            return None
+        return _decode_message(data)
+
+    def update_message(self, session_id: str, agent_id: str, session_message: SessionMessage, **kwargs: Any) -> None:
+        previous_message = self.read_message(session_id, agent_id, session_message.message_id)
+        if previous_message is None:
+            raise SessionException(f"Message {session_message.message_id} does not exist")
+        session_message.created_at = previous_message.created_at
+        self.create_message(session_id, agent_id, session_message)
+
+    def list_messages(
+        self, session_id: str, agent_id: str, limit: int | None = None, offset: int = 0, **kwargs: Any
+    ) -> list[SessionMessage]:
+        log = self._log(session_id)
+        if agent_id not in log.agents:
+            raise SessionException(f"Agent {agent_id} in session {session_id} does not exist")
+        messages = log.messages.get(agent_id, {})
+        message_ids = sorted(messages)
+        message_ids = message_ids[offset : offset + limit] if limit is not None else message_ids[offset:]
+        # Only the requested window is decoded
+        return [_decode_message(messages[message_id]) for message_id in message_ids]
+
+    def create_multi_agent(self, session_id: str, multi_agent: "MultiAgentBase", **kwargs: Any) -> None:
+        self._log(session_id).append(MULTI_AGENT_RECORD, multi_agent.serialize_state(), multi_agent.id)
+
+    def read_multi_agent(self, session_id: str, multi_agent_id: str, **kwargs: Any) -> dict[str, Any] | None:
+        data = self._log(session_id).multi_agents.get(multi_agent_id)
+        return json.loads(data) if data is not None else None
+
+    def update_multi_agent(self, session_id: str, multi_agent: "MultiAgentBase", **kwargs: Any) -> None:
+        if self.read_multi_agent(session_id, multi_agent.id) is None:
+            raise SessionException(f"MultiAgent state {multi_agent.id} in session {session_id} does not exist")
+        self.create_multi_agent(session_id, multi_agent)
+
+
+def create_session_manager(session_id: str, store: str = SESSION_STORE):
+    """
+    Build the session manager for an agent.
+
+    Args:
+        session_id: The runtime session id.
+        store: "log" for the append-only write-behind store, "file" for
+            strands' FileSessionManager.
+    """
+    if store == "file":
+        return FileSessionManager(session_id=session_id)
+    if store == "log":
+        return RepositorySessionManager(
+            session_id=session_id, session_repository=AppendLogSessionRepository()
+        )
+    raise ValueError(f"Unknown SESSION_STORE: {store}")
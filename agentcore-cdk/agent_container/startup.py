@@ -0,0 +1,124 @@
+"""
+Container pre-warm for the agent runtime.
+
+runtime_agent imports the heavy agent stack (strands, boto3, mcp, httpx)
+lazily so the HTTP server starts listening right away. With pre-warm on,
+a background thread then imports it, creates the boto clients, loads the
+gateway tool catalog (which also opens the shared MCP session) and builds
+the process-wide BedrockModel the agents use, while the container waits for
+its first request. The entrypoint awaits `wait_ready()` before using an
+agent, so a request arriving mid-warm-up waits for the work in flight
+instead of repeating it.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from typing import Callable
+
+
+AGENT_PREWARM = os.environ.get("AGENT_PREWARM", "true").lower() == "true"
+AGENT_PREWARM_TIMEOUT = float(os.environ.get("AGENT_PREWARM_TIMEOUT", 60))
+
+
+class Prewarmer:
+    """Runs initialization steps on a background thread behind a readiness gate."""
+
+    def __init__(self, steps: list[tuple[str, Callable[[], None]]]):
+        self.steps = steps
+        self.timings: dict[str, float] = {}
+        self.errors: dict[str, str] = {}
+        self._ready = threading.Event()
+        self._thread = None
+        # (loop, asyncio.Event) of the requests waiting for warm-up, set from the warm-up thread
+        self._waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        try:
+            for name, step in self.steps:
+                started = time.perf_counter()
+                try:
+                    step()
+                except Exception as e:
+                    # Warm-up is best effort, the request path redoes whatever failed
+                    self.errors[name] = str(e)
+                    print(f"Pre-warm step {name} failed: {e}")
+                self.timings[name] = time.perf_counter() - started
+            summary = ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in self.timings.items())
+            print(f"Pre-warm done: {summary}")
+        finally:
+            with self._lock:
+                self._ready.set()
+                waiters, self._waiters = self._waiters, []
+            for loop, event in waiters:
+                try:
+                    loop.call_soon_threadsafe(event.set)
+                except RuntimeError:
+                    # The waiter's loop is already closed
+                    pass
+
+    async def wait_ready(self, timeout: float = AGENT_PREWARM_TIMEOUT) -> bool:
+        """Wait until warm-up finished, without holding a thread. Returns False if it timed out."""
+        if self._thread is None or self._ready.is_set():
+            return True
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            if self._ready.is_set():
+                return True
+            self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter[1].wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+
+
+def prewarm_steps(gateway_url: str | None, model_id: str) -> list[tuple[str, Callable[[], None]]]:
+    """The warm-up steps for the AgentService stack."""
+
+    def import_agent_stack():
+        import agent_class  # noqa: F401
+
+    def create_boto_clients():
+        from agent_class import boto_session, boto_session_lock, config, get_gateway_credentials
+
+        # Resolves credentials and loads the service model on the shared session
+        with boto_session_lock:
+            boto_session.client("bedrock-runtime", config=config)
+            boto_session.get_credentials()
+        get_gateway_credentials()
+
+    def load_tool_catalog():
+        if not gateway_url:
+            return
+        from agent_class import list_gateway_tools
+        from tool_catalog import tool_catalog
+
+        tool_catalog.get(gateway_url, lambda: list_gateway_tools(gateway_url))
+
+    def build_model():
+        from agent_class import shared_model
+
+        shared_model(model_id)
+
+    return [
+        ("imports", import_agent_stack),
+        ("boto_clients", create_boto_clients),
+        ("tool_catalog", load_tool_catalog),
+        ("model", build_model),
+    ]
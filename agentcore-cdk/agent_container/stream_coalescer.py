@@ -0,0 +1,163 @@
+"""
+Coalescing of text deltas before they are sent as SSE frames.
+
+Strands yields every model token twice: once as the raw Bedrock
+`contentBlockDelta` event and once as a `{"data", "delta"}` text chunk, and
+each of them becomes its own SSE frame. `coalesce_deltas` merges consecutive
+text deltas into one chunk of each kind until `max_bytes` of text is
+buffered or `flush_interval` seconds have passed since the first buffered
+delta. Any other chunk (tool use, tool results, stop events...) flushes the
+buffer and is forwarded right away. The first text delta of a stream is
+never delayed, so time-to-first-token is unchanged.
+
+The wrapped stream is consumed by a single task feeding a queue, so every
+step of the agent's generator runs in the same task and context: context
+variables and OpenTelemetry spans attached in one step are still current
+in the next.
+"""
+
+import asyncio
+import os
+from typing import Any, AsyncGenerator, AsyncIterator
+
+
+STREAM_COALESCE_MS = float(os.environ.get("STREAM_COALESCE_MS", 0))
+STREAM_COALESCE_MAX_BYTES = int(os.environ.get("STREAM_COALESCE_MAX_BYTES", 1024))
+# Chunks read ahead of the consumer
+QUEUE_SIZE = 64
+
+_END = object()
+
+
+def _text_delta(chunk: dict) -> tuple[str, str, Any] | None:
+    """Return (kind, text, block_index) if the chunk is a plain text delta."""
+    if len(chunk) == 2 and "data" in chunk:
+        delta = chunk.get("delta")
+        if delta is not None and len(delta) == 1 and "text" in delta:
+            return "data", delta["text"], None
+    elif len(chunk) == 1 and "event" in chunk:
+        content_block_delta = chunk["event"].get("contentBlockDelta")
+        if content_block_delta is not None and len(chunk["event"]) == 1:
+            delta = content_block_delta.get("delta", {})
+            if len(delta) == 1 and "text" in delta:
+                return "event", delta["text"], content_block_delta.get("contentBlockIndex")
+    return None
+
+
+class _DeltaBuffer:
+    def __init__(self):
+        self.kinds: list[str] = []
+        self.texts: dict[str, list[str]] = {}
+        self.block_index = None
+        self.size = 0
+
+    def __bool__(self):
+        return bool(self.kinds)
+
+    def add(self, kind: str, text: str, block_index):
+        if kind not in self.texts:
+            self.kinds.append(kind)
+            self.texts[kind] = []
+        if kind == "event":
+            self.block_index = block_index
+        self.texts[kind].append(text)
+        # Both kinds carry the same tokens, count the text once
+        if kind == self.kinds[0]:
+            self.size += len(text.encode("utf-8"))
+
+    def drain(self) -> list[dict]:
+        chunks = []
+        for kind in self.kinds:
+            text = "".join(self.texts[kind])
+            if kind == "data":
+                chunks.append({"data": text, "delta": {"text": text}})
+            else:
+                content_block_delta = {"delta": {"text": text}}
+                if self.block_index is not None:
+                    content_block_delta["contentBlockIndex"] = self.block_index
+                chunks.append({"event": {"contentBlockDelta": content_block_delta}})
+        self.__init__()
+        return chunks
+
+
+async def coalesce_deltas(
+    stream: AsyncIterator[dict],
+    flush_interval: float = STREAM_COALESCE_MS / 1000,
+    max_bytes: int = STREAM_COALESCE_MAX_BYTES,
+) -> AsyncGenerator[dict, None]:
+    """
+    Merge consecutive text deltas of `stream` into larger chunks.
+
+    Args:
+        stream: Chunks as yielded by AgentService.invoke_async.
+        flush_interval: Maximum seconds a delta waits in the buffer.
+        max_bytes: Buffered text size (UTF-8 bytes) that forces a flush.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(QUEUE_SIZE)
+
+    async def pump():
+        # (chunk, None), then (_END, exception or None)
+        try:
+            async for chunk in stream:
+                await queue.put((chunk, None))
+        except Exception as e:
+            await queue.put((_END, e))
+        else:
+            await queue.put((_END, None))
+        finally:
+            aclose = getattr(stream, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    producer = asyncio.ensure_future(pump())
+    buffer = _DeltaBuffer()
+    deadline = 0.0
+    seen_text = set()
+
+    try:
+        while True:
+            if buffer:
+                try:
+                    chunk, error = await asyncio.wait_for(queue.get(), max(0.0, deadline - loop.time()))
+                except asyncio.TimeoutError:
+                    # Flush interval elapsed while waiting for the next chunk
+                    for merged in buffer.drain():
+                        yield merged
+                    continue
+            else:
+                chunk, error = await queue.get()
+
+            if chunk is _END:
+                for merged in buffer.drain():
+                    yield merged
+                if error is not None:
+                    raise error
+                break
+
+            text_delta = _text_delta(chunk)
+            if text_delta is None:
+                for merged in buffer.drain():
+                    yield merged
+                yield chunk
+                continue
+
+            kind, text, block_index = text_delta
+            if kind not in seen_text:
+                # Never hold back the first token of each kind
+                seen_text.add(kind)
+                yield chunk
+                continue
+
+            if kind == "event" and "event" in buffer.texts and buffer.block_index != block_index:
+                for merged in buffer.drain():
+                    yield merged
+            if not buffer:
+                deadline = loop.time() + flush_interval
+            buffer.add(kind, text, block_index)
+            if buffer.size >= max_bytes:
+                for merged in buffer.drain():
+                    yield merged
+    finally:
+        producer.cancel()
+        await asyncio.gather(producer, return_exceptions=True)
@@ -0,0 +1,75 @@
+"""
+Projection of the chunks streamed back to clients.
+
+Strands merges the whole invocation state (agent, model, messages, traces...)
+into every text delta. Instead of deleting those keys one by one from each
+chunk, `project_chunk` builds a new dict holding only the whitelisted event
+fields. Values are shared with the original chunk, nothing is copied.
+AgentService.invoke_async applies it to the events the entrypoint yields,
+so the runtime's own SSE encoder only sees the projected chunks.
+"""
+
+
+# Top-level keys of the strands stream events clients consume
+STREAM_CHUNK_FIELDS = frozenset(
+    {
+        "init_event_loop",
+        "start",
+        "start_event_loop",
+        "event",
+        "data",
+        "delta",
+        "citation",
+        "reasoning",
+        "reasoningText",
+        "reasoningRedactedContent",
+        "reasoning_signature",
+        "type",
+        "current_tool_use",
+        "tool_result",
+        "tool_stream_event",
+        "tool_cancel_event",
+        "tool_interrupt_event",
+        "event_loop_throttled_delay",
+        "message",
+        "structured_output",
+        "force_stop",
+        "force_stop_reason",
+        "stop",
+        "result",
+        "complete",
+        "error",
+    }
+)
+
+
+# Fields of text/reasoning deltas, the hot path of the stream
+DELTA_FIELDS = (
+    "data",
+    "delta",
+    "citation",
+    "reasoning",
+    "reasoningText",
+    "reasoningRedactedContent",
+    "reasoning_signature",
+)
+
+
+def project_chunk(chunk: dict, fields: frozenset = STREAM_CHUNK_FIELDS) -> dict | None:
+    """
+    Return a new dict with only the whitelisted fields of a stream chunk.
+
+    Returns None for tool-use input deltas, which are dropped from the stream.
+    """
+    delta = chunk.get("delta")
+    if delta is not None:
+        if delta.get("toolUse"):
+            return None
+        return {key: chunk[key] for key in DELTA_FIELDS if key in chunk}
+
+    event = chunk.get("event", chunk)
+    content_block_delta = event.get("contentBlockDelta")
+    if content_block_delta is not None and content_block_delta.get("delta", {}).get("toolUse"):
+        return None
+    return {key: value for key, value in chunk.items() if key in fields}
+
@@ -3,66 +3,271 @@ StreamableHTTP Client Transport with AWS SigV4 Signing
 
 This module extends the MCP StreamableHTTPTransport to add AWS SigV4 request signing
 for authentication with MCP servers that authenticate using AWS IAM.
+
+Clients are created by `per_loop_http_client_factory`, which reuses one TLS
+context for the whole process and one HTTP/2 connection pool for the MCP
+sessions running on the same event loop. strands' MCPClient runs every
+client on its own background loop, so in the agent the pool serves one
+client's requests and SSE stream; connections are not shared between
+MCPClients, only the TLS context (with its loaded CA bundle) is.
 """
 
+import asyncio
+import calendar
+import hashlib
+import hmac
+import os
+import re
+import threading
+import time
+import weakref
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone
+from email.utils import formatdate
 from typing import Generator
+from urllib.parse import quote, urlsplit
 
 import httpx
 from anyio.streams.memory import MemoryObjectReceiveStream, MemoryObjectSendStream
-from botocore.auth import SigV4Auth
-from botocore.awsrequest import AWSRequest
+from botocore.auth import (
+    EMPTY_SHA256_HASH,
+    SIGNED_HEADERS_BLACKLIST,
+    SIGV4_TIMESTAMP,
+    UNSIGNED_PAYLOAD,
+    _host_from_url,
+)
 from botocore.credentials import Credentials
+from botocore.utils import normalize_url_path
 from mcp.client.streamable_http import (
     GetSessionIdCallback,
     StreamableHTTPTransport,
     streamablehttp_client,
 )
-from mcp.shared._httpx_utils import McpHttpClientFactory, create_mcp_http_client
+from mcp.shared._httpx_utils import (
+    MCP_DEFAULT_SSE_READ_TIMEOUT,
+    MCP_DEFAULT_TIMEOUT,
+    McpHttpClientFactory,
+)
 from mcp.shared.message import SessionMessage
 
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+# Off by default: MCP sessions sharing one HTTP/2 pool have shown read/write errors
+# under load in bench_mcp_http_pool.py, HTTP/1.1 pools have not
+MCP_HTTP2 = os.environ.get("MCP_HTTP2", "false").lower() == "true"
+MCP_HTTP_MAX_CONNECTIONS = int(os.environ.get("MCP_HTTP_MAX_CONNECTIONS", 100))
+MCP_HTTP_MAX_KEEPALIVE = int(os.environ.get("MCP_HTTP_MAX_KEEPALIVE", 20))
+MCP_HTTP_KEEPALIVE_EXPIRY = float(os.environ.get("MCP_HTTP_KEEPALIVE_EXPIRY", 60))
+MCP_HTTP2_MAX_STREAMS = int(os.environ.get("MCP_HTTP2_MAX_STREAMS", 50))
+MCP_SIGV4_UNSIGNED_PAYLOAD = os.environ.get("MCP_SIGV4_UNSIGNED_PAYLOAD", "false").lower() == "true"
+MCP_SIGV4_UNSIGNED_MIN_BYTES = int(os.environ.get("MCP_SIGV4_UNSIGNED_MIN_BYTES", 64 * 1024))
+MCP_SIGV4_UNSIGNED_RETRY_AFTER = float(os.environ.get("MCP_SIGV4_UNSIGNED_RETRY_AFTER", 3600))
+
+# Error bodies blaming the payload hash or the signature, as opposed to e.g. expired credentials
+PAYLOAD_REJECTION = re.compile(rb"content-sha256|payload|signature", re.IGNORECASE)
+
+
+class SigV4Signer:
+    """
+    AWS SigV4 signer working directly on httpx requests.
+
+    Produces the same signature as botocore's SigV4Auth, without building an
+    AWSRequest for every message. The derived signing key only changes with
+    the date and the credentials, so it is cached per
+    (date, region, service, credentials) instead of re-deriving the HMAC
+    chain for every request.
+    """
+
+    def __init__(self, credentials: Credentials, service: str, region: str):
+        self.credentials = credentials
+        self.service = service
+        self.region = region
+        self._signing_key = None
+        self._signing_key_id = None
+        self._lock = threading.Lock()
+
+    def signing_key(self, date: str, access_key: str, secret_key: str) -> bytes:
+        key_id = (date, self.region, self.service, access_key, secret_key)
+        # Read both attributes at once, another thread may be replacing them
+        cached = self._signing_key_id, self._signing_key
+        if cached[0] == key_id:
+            return cached[1]
+
+        k_date = hmac.new(f"AWS4{secret_key}".encode(), date.encode(), hashlib.sha256).digest()
+        k_region = hmac.new(k_date, self.region.encode(), hashlib.sha256).digest()
+        k_service = hmac.new(k_region, self.service.encode(), hashlib.sha256).digest()
+        k_signing = hmac.new(k_service, b"aws4_request", hashlib.sha256).digest()
+        with self._lock:
+            self._signing_key_id, self._signing_key = key_id, k_signing
+        return k_signing
+
+    def frozen_credentials(self):
+        # Refreshable credentials must be read as one consistent snapshot
+        get_frozen_credentials = getattr(self.credentials, "get_frozen_credentials", None)
+        return get_frozen_credentials() if get_frozen_credentials else self.credentials
+
+    def sign(self, request: httpx.Request, timestamp: str | None = None, unsigned_payload: bool = False) -> None:
+        """
+        Add the X-Amz-Date, X-Amz-Security-Token and Authorization headers.
+
+        With `unsigned_payload` the body is not hashed, the signature covers
+        an `X-Amz-Content-SHA256: UNSIGNED-PAYLOAD` header instead.
+        """
+        credentials = self.frozen_credentials()
+        timestamp = timestamp or datetime.now(timezone.utc).strftime(SIGV4_TIMESTAMP)
+        date = timestamp[:8]
+
+        headers = request.headers
+        headers.pop("authorization", None)
+        if "date" in headers:
+            headers["Date"] = formatdate(calendar.timegm(time.strptime(timestamp, SIGV4_TIMESTAMP)))
+            headers.pop("x-amz-date", None)
+        else:
+            headers["X-Amz-Date"] = timestamp
+        if credentials.token:
+            headers["X-Amz-Security-Token"] = credentials.token
+        if unsigned_payload:
+            headers["X-Amz-Content-SHA256"] = UNSIGNED_PAYLOAD
+
+        # httpx lower-cases names and joins repeated headers with ", "
+        headers_to_sign = {
+            name: " ".join(value.split())
+            for name, value in headers.items()
+            if name not in SIGNED_HEADERS_BLACKLIST
+        }
+        if "host" not in headers_to_sign:
+            headers_to_sign["host"] = _host_from_url(str(request.url))
+        signed_header_names = sorted(headers_to_sign)
+        signed_headers = ";".join(signed_header_names)
+
+        payload_hash = headers.get("x-amz-content-sha256")
+        if payload_hash is None:
+            body = request.content
+            payload_hash = hashlib.sha256(body).hexdigest() if body else EMPTY_SHA256_HASH
+
+        url = urlsplit(str(request.url))
+        query = "&".join(f"{key}={value}" for key, _, value in
+                         sorted(pair.partition("=") for pair in url.query.split("&"))) if url.query else ""
+        canonical_request = "\n".join(
+            [
+                request.method.upper(),
+                quote(normalize_url_path(url.path), safe="/~"),
+                query,
+                "".join(f"{name}:{headers_to_sign[name]}\n" for name in signed_header_names),
+                signed_headers,
+                payload_hash,
+            ]
+        )
+
+        scope = f"{date}/{self.region}/{self.service}/aws4_request"
+        string_to_sign = "\n".join(
+            ["AWS4-HMAC-SHA256", timestamp, scope, hashlib.sha256(canonical_request.encode()).hexdigest()]
+        )
+        signing_key = self.signing_key(date, credentials.access_key, credentials.secret_key)
+        signature = hmac.new(signing_key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+        headers["Authorization"] = (
+            f"AWS4-HMAC-SHA256 Credential={credentials.access_key}/{scope}, "
+            f"SignedHeaders={signed_headers}, Signature={signature}"
+        )
+
 
 class SigV4HTTPXAuth(httpx.Auth):
-    """HTTPX Auth class that signs requests with AWS SigV4."""
+    """
+    HTTPX Auth class that signs requests with AWS SigV4.
+
+    With `unsigned_payload`, HTTPS request bodies of at least
+    `unsigned_min_bytes` are signed as UNSIGNED-PAYLOAD, so large tool inputs
+    are not hashed before they are sent; TLS still protects their integrity.
+    Not every endpoint accepts it: if one answers 400 or 403 to an unsigned
+    request with an error about the payload hash or the signature, the
+    request is signed in full and sent again, and that host only gets fully
+    signed requests for `unsigned_retry_after` seconds. Other 400/403
+    errors (expired credentials, missing permissions) are returned as they
+    are and leave unsigned payloads on.
+    """
 
     def __init__(
         self,
         credentials: Credentials,
         service: str,
         region: str,
+        unsigned_payload: bool = MCP_SIGV4_UNSIGNED_PAYLOAD,
+        unsigned_min_bytes: int = MCP_SIGV4_UNSIGNED_MIN_BYTES,
+        unsigned_retry_after: float = MCP_SIGV4_UNSIGNED_RETRY_AFTER,
     ):
         self.credentials = credentials
         self.service = service
         self.region = region
-        self.signer = SigV4Auth(credentials, service, region)
+        self.signer = SigV4Signer(credentials, service, region)
+        self.unsigned_payload = unsigned_payload
+        self.unsigned_min_bytes = unsigned_min_bytes
+        self.unsigned_retry_after = unsigned_retry_after
+        # Hosts that rejected an unsigned payload, and time.monotonic() when to try again
+        self.unsigned_rejected: dict[str, float] = {}
+
+    def use_unsigned_payload(self, request: httpx.Request) -> bool:
+        return (
+            self.unsigned_payload
+            and request.url.scheme == "https"
+            and self.unsigned_rejected.get(request.url.host, 0) <= time.monotonic()
+            and "x-amz-content-sha256" not in request.headers
+            # Only bodies that can be sent again if the endpoint rejects them
+            and isinstance(request.stream, httpx.ByteStream)
+            and int(request.headers.get("content-length", 0)) >= self.unsigned_min_bytes
+        )
+
+    def rejects_unsigned_payload(self, request: httpx.Request, response: httpx.Response) -> bool:
+        if response.status_code not in (400, 403) or not PAYLOAD_REJECTION.search(response.content):
+            return False
+        print(f"{request.url.host} rejected an unsigned payload, signing payloads in full")
+        self.unsigned_rejected[request.url.host] = time.monotonic() + self.unsigned_retry_after
+        return True
+
+    def sign_in_full(self, request: httpx.Request) -> httpx.Request:
+        del request.headers["x-amz-content-sha256"]
+        self.signer.sign(request)
+        return request
 
     def auth_flow(
         self, request: httpx.Request
     ) -> Generator[httpx.Request, httpx.Response, None]:
         """Signs the request with SigV4 and adds the signature to the request headers."""
 
-        # Create an AWS request
-        headers = dict(request.headers)
         # Header 'connection' = 'keep-alive' is not used in calculating the request
-        # signature on the server-side, and results in a signature mismatch if included
-        headers.pop("connection", None)  # Remove if present, ignore if not
+        # signature on the server-side, it is part of SIGNED_HEADERS_BLACKLIST
+        if not self.use_unsigned_payload(request):
+            self.signer.sign(request)
+            yield request
+            return
 
-        aws_request = AWSRequest(
-            method=request.method,
-            url=str(request.url),
-            data=request.content,
-            headers=headers,
-        )
-
-        # Sign the request with SigV4
-        self.signer.add_auth(aws_request)
+        self.signer.sign(request, unsigned_payload=True)
+        response = yield request
+        if response.status_code in (400, 403):
+            # Error bodies are small; successful (SSE) responses are never read here
+            response.read()
+            if self.rejects_unsigned_payload(request, response):
+                yield self.sign_in_full(request)
 
-        # Add the signature header to the original request
-        request.headers.update(dict(aws_request.headers))
+    async def async_auth_flow(self, request: httpx.Request) -> AsyncGenerator[httpx.Request, httpx.Response]:
+        if not self.use_unsigned_payload(request):
+            self.signer.sign(request)
+            yield request
+            return
 
-        yield request
+        self.signer.sign(request, unsigned_payload=True)
+        response = yield request
+        if response.status_code in (400, 403):
+            await response.aread()
+            if self.rejects_unsigned_payload(request, response):
+                yield self.sign_in_full(request)
 
 
 class StreamableHTTPTransportWithSigV4(StreamableHTTPTransport):
@@ -108,6 +313,155 @@ class StreamableHTTPTransportWithSigV4(StreamableHTTPTransport):
         self.region = region
 
 
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response body that calls `release` once when it is closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release):
+        self.stream = stream
+        self.release = release
+
+    async def __aiter__(self):
+        async for chunk in self.stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self.stream.aclose()
+        finally:
+            release, self.release = self.release, None
+            if release is not None:
+                release()
+
+
+class _LoopTransport(httpx.AsyncBaseTransport):
+    """
+    Connection pools shared by the clients of one event loop; they are closed
+    when the last of those clients is closed.
+
+    httpcore multiplexes every request of a pool on one HTTP/2 connection and
+    never opens a second one, while every MCP session keeps an SSE stream
+    open on it for its whole life. Requests are spread over as many pools as
+    needed to keep at most `max_streams` of them open on each connection,
+    below the server's concurrent stream limit.
+    """
+
+    def __init__(self, create_pool, max_streams: int, on_close):
+        self.create_pool = create_pool
+        self.max_streams = max_streams
+        self.on_close = on_close
+        # [pool, open streams], only touched from the event loop that owns them
+        self.pools: list[list] = []
+        # Clients created on this transport and not closed yet
+        self.clients = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        entry = next((entry for entry in self.pools if entry[1] < self.max_streams), None)
+        if entry is None:
+            entry = [self.create_pool(), 0]
+            self.pools.append(entry)
+
+        def release():
+            entry[1] -= 1
+
+        entry[1] += 1
+        try:
+            response = await entry[0].handle_async_request(request)
+        except BaseException:
+            release()
+            raise
+        response.stream = _ReleasingStream(response.stream, release)
+        return response
+
+    async def aclose(self) -> None:
+        # Called by each client's aclose, on the loop that owns the pools
+        self.clients -= 1
+        if self.clients > 0:
+            return
+        self.on_close(self)
+        pools, self.pools = self.pools, []
+        for pool, _ in pools:
+            await pool.aclose()
+
+
+class PerLoopHTTPClientFactory:
+    """
+    McpHttpClientFactory whose clients share one connection pool per event loop.
+
+    streamablehttp_client closes the client it gets from the factory when the
+    MCP session ends, so every client is a cheap wrapper (own headers, timeout
+    and auth) around the transport of its loop. Connections are bound to the
+    event loop that opened them, so clients on different loops, like strands
+    MCPClients, each get their own pools; only the TLS context, with its
+    loaded CA bundle, is shared by all of them. The pools of a loop are closed
+    with the last client using them.
+    """
+
+    def __init__(
+        self,
+        http2: bool = MCP_HTTP2,
+        max_connections: int = MCP_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections: int = MCP_HTTP_MAX_KEEPALIVE,
+        keepalive_expiry: float = MCP_HTTP_KEEPALIVE_EXPIRY,
+        max_streams: int = MCP_HTTP2_MAX_STREAMS,
+    ):
+        """
+        Args:
+            http2: Negotiate HTTP/2 when the h2 package is installed.
+            max_connections: Connections each pool may open.
+            max_keepalive_connections: Idle connections each pool keeps open.
+            keepalive_expiry: Seconds an idle connection is kept.
+            max_streams: Requests open at once on one HTTP/2 connection.
+        """
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.max_streams = max_streams
+        self._ssl_context = None
+        self._transports: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def transport(self) -> _LoopTransport:
+        """The transport of the running event loop, counting one more client on it."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            transport = self._transports.get(loop)
+            if transport is None:
+                if self._ssl_context is None:
+                    self._ssl_context = httpx.create_ssl_context()
+                transport = self._transports[loop] = _LoopTransport(
+                    self._create_pool,
+                    # HTTP/1.1 pools open as many connections as they need
+                    self.max_streams if self.http2 else float("inf"),
+                    lambda closed: self._forget(loop, closed),
+                )
+            transport.clients += 1
+            return transport
+
+    def _forget(self, loop, transport: _LoopTransport):
+        with self._lock:
+            if self._transports.get(loop) is transport:
+                del self._transports[loop]
+
+    def _create_pool(self) -> httpx.AsyncHTTPTransport:
+        return httpx.AsyncHTTPTransport(verify=self._ssl_context, http2=self.http2, limits=self.limits)
+
+    def __call__(
+        self,
+        headers: dict[str, str] | None = None,
+        timeout: httpx.Timeout | None = None,
+        auth: httpx.Auth | None = None,
+    ) -> httpx.AsyncClient:
+        if timeout is None:
+            timeout = httpx.Timeout(MCP_DEFAULT_TIMEOUT, read=MCP_DEFAULT_SSE_READ_TIMEOUT)
+        return httpx.AsyncClient(headers=headers, timeout=timeout, auth=auth, transport=self.transport())
+
+
+per_loop_http_client_factory = PerLoopHTTPClientFactory()
+
+
 @asynccontextmanager
 async def streamablehttp_client_with_sigv4(
     url: str,
@@ -118,7 +472,7 @@ async def streamablehttp_client_with_sigv4(
     timeout: float | timedelta = 30,
     sse_read_timeout: float | timedelta = 60 * 5,
     terminate_on_close: bool = True,
-    httpx_client_factory: McpHttpClientFactory = create_mcp_http_client,
+    httpx_client_factory: McpHttpClientFactory = per_loop_http_client_factory,
 ) -> AsyncGenerator[
     tuple[
         MemoryObjectReceiveStream[SessionMessage | Exception],
@@ -0,0 +1,114 @@
+"""
+Per-phase latency instrumentation for the agent container.
+
+Every phase of a request (agent setup, tool listing, MCP handshake, session
+load and persistence, model calls, model time-to-first-token, tool calls) is
+recorded as an OpenTelemetry span and as a sample of the
+`agent.phase.duration` histogram, tagged with the phase, model id and tool
+name. The container runs under `opentelemetry-instrument`, which exports
+both.
+
+Set AGENT_WATERFALL_DIR to also write a JSON waterfall of each request
+(phase start offsets and durations) to that directory for offline analysis.
+"""
+
+import contextvars
+import json
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any
+
+from opentelemetry import metrics, trace
+
+
+AGENT_WATERFALL_DIR = os.environ.get("AGENT_WATERFALL_DIR", "")
+
+tracer = trace.get_tracer("agent_container")
+meter = metrics.get_meter("agent_container")
+phase_duration = meter.create_histogram(
+    "agent.phase.duration", unit="ms", description="Duration of each phase of an agent request"
+)
+
+_waterfall: contextvars.ContextVar[dict | None] = contextvars.ContextVar("agent_waterfall", default=None)
+
+
+def record_phase(name: str, started: float, duration: float, **attributes: Any):
+    """Record a finished phase. `started` and `duration` are perf_counter seconds."""
+    attributes = {key: value for key, value in attributes.items() if value is not None}
+    phase_duration.record(duration * 1000, {"phase": name, **attributes})
+
+    waterfall = _waterfall.get()
+    if waterfall is not None:
+        waterfall["phases"].append(
+            {
+                "phase": name,
+                "start_ms": round((started - waterfall["_started"]) * 1000, 3),
+                "duration_ms": round(duration * 1000, 3),
+                **attributes,
+            }
+        )
+
+
+@contextmanager
+def phase(name: str, **attributes: Any):
+    """Time a block as one phase, inside its own span."""
+    with tracer.start_as_current_span(
+        f"agent.{name}", attributes={key: value for key, value in attributes.items() if value is not None}
+    ):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            record_phase(name, started, time.perf_counter() - started, **attributes)
+
+
+@contextmanager
+def request_waterfall(session_id: str | None, model_id: str):
+    """Collect the phases of one request and dump them when AGENT_WATERFALL_DIR is set."""
+    if not AGENT_WATERFALL_DIR:
+        yield
+        return
+
+    waterfall = {
+        "request_id": str(uuid.uuid4()),
+        "session_id": session_id,
+        "model_id": model_id,
+        "started_at": time.time(),
+        "_started": time.perf_counter(),
+        "phases": [],
+    }
+    token = _waterfall.set(waterfall)
+    try:
+        yield
+    finally:
+        try:
+            _waterfall.reset(token)
+        except ValueError:
+            # Streaming generator closed from another context
+            pass
+        waterfall["total_ms"] = round((time.perf_counter() - waterfall.pop("_started")) * 1000, 3)
+        os.makedirs(AGENT_WATERFALL_DIR, exist_ok=True)
+        path = os.path.join(AGENT_WATERFALL_DIR, f"{waterfall['request_id']}.json")
+        with open(path, "w") as f:
+            json.dump(waterfall, f, indent=2)
+
+
+def instrument_session_manager(session_manager, model_id: str):
+    """Time the session manager calls strands makes from its hooks."""
+    phases = {
+        "initialize": "session_load",
+        "append_message": "session_persist",
+        "sync_agent": "session_persist",
+    }
+    for method_name, phase_name in phases.items():
+        method = getattr(session_manager, method_name)
+
+        def timed(*args, _method=method, _phase=phase_name, **kwargs):
+            with phase(_phase, model_id=model_id):
+                return _method(*args, **kwargs)
+
+        # The session manager hooks look the method up on every call
+        setattr(session_manager, method_name, timed)
+    return session_manager
@@ -0,0 +1,137 @@
+"""
+Process-wide cache of the MCP tool definitions exposed by a gateway.
+
+The gateway tool set only changes on deploy, so every AgentService in the
+process shares one catalog per gateway URL instead of calling
+`list_tools_sync()` on construction. Entries older than the TTL are still
+served while a background thread refreshes them (stale-while-revalidate).
+When a snapshot path is configured the catalog is also persisted to disk so
+a cold container can start from the last known tool set.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Callable
+
+from mcp.types import Tool
+
+
+TOOL_CATALOG_TTL = float(os.environ.get("TOOL_CATALOG_TTL", 300))
+TOOL_CATALOG_SNAPSHOT = os.environ.get("TOOL_CATALOG_SNAPSHOT", "")
+
+
+class ToolCatalog:
+    """TTL cache of MCP tool definitions keyed by gateway URL."""
+
+    def __init__(self, ttl: float = TOOL_CATALOG_TTL, snapshot_path: str = TOOL_CATALOG_SNAPSHOT):
+        """
+        Args:
+            ttl: Seconds a fetched catalog is considered fresh.
+            snapshot_path: Optional JSON file used to persist the catalog.
+        """
+        self.ttl = ttl
+        self.snapshot_path = snapshot_path
+        self._entries: dict[str, tuple[float, list[Tool]]] = {}
+        self._refreshing: set[str] = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    def get(self, key: str, loader: Callable[[], list[Tool]]) -> list[Tool]:
+        """
+        Return the tools for `key`, calling `loader` only when nothing is cached.
+
+        Stale entries are returned immediately and refreshed in the background.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._load_snapshot(key)
+
+        if entry is None:
+            self.misses += 1
+            return self._refresh(key, loader)
+
+        self.hits += 1
+        fetched_at, tools = entry
+        if time.time() - fetched_at > self.ttl:
+            self._refresh_in_background(key, loader)
+        return tools
+
+    def invalidate(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def _refresh(self, key: str, loader: Callable[[], list[Tool]]) -> list[Tool]:
+        tools = list(loader())
+        fetched_at = time.time()
+        with self._lock:
+            self._entries[key] = (fetched_at, tools)
+        self.refreshes += 1
+        self._save_snapshot(key, fetched_at, tools)
+        return tools
+
+    def _refresh_in_background(self, key: str, loader: Callable[[], list[Tool]]):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                self._refresh(key, loader)
+            except Exception as e:
+                # Keep serving the stale catalog, the next get() retries
+                print(f"Tool catalog refresh failed for {key}: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def _read_snapshot_file(self) -> dict:
+        try:
+            with open(self.snapshot_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _load_snapshot(self, key: str) -> tuple[float, list[Tool]] | None:
+        if not self.snapshot_path:
+            return None
+        data = self._read_snapshot_file().get(key)
+        if not data:
+            return None
+        try:
+            tools = [Tool.model_validate(tool) for tool in data["tools"]]
+        except Exception as e:
+            print(f"Ignoring tool catalog snapshot for {key}: {e}")
+            return None
+
+        # Always revalidate a snapshot coming from disk on first use
+        entry = (0.0, tools)
+        with self._lock:
+            self._entries.setdefault(key, entry)
+        return self._entries[key]
+
+    def _save_snapshot(self, key: str, fetched_at: float, tools: list[Tool]):
+        if not self.snapshot_path:
+            return
+        with self._lock:
+            data = self._read_snapshot_file()
+            data[key] = {
+                "fetched_at": fetched_at,
+                "tools": [tool.model_dump(mode="json", exclude_none=True) for tool in tools],
+            }
+            tmp_path = f"{self.snapshot_path}.tmp"
+            try:
+                with open(tmp_path, "w") as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, self.snapshot_path)
+            except OSError as e:
+                print(f"Could not write tool catalog snapshot: {e}")
+
+
+tool_catalog = ToolCatalog()
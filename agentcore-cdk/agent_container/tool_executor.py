@@ -0,0 +1,78 @@
+"""
+Concurrent execution of the tool calls of one model turn.
+
+When the model asks for several `web_extract` or `aws_blogs_search` calls in
+the same assistant message they are independent, so they run at the same
+time over the shared MCP session (strands' ConcurrentToolExecutor, which
+also returns the results in tool-use order). A per-tool cap, shared by all
+concurrent requests in the process, keeps the container from flooding a
+single gateway target.
+"""
+
+import asyncio
+import os
+import threading
+import weakref
+from typing import Any
+
+from strands.tools.executors import ConcurrentToolExecutor
+from strands.types.tools import ToolUse
+
+
+TOOL_CONCURRENCY_DEFAULT = int(os.environ.get("TOOL_CONCURRENCY_DEFAULT", 4))
+# Per tool overrides, e.g. "web_extract=3,aws_blogs_search=4"
+TOOL_CONCURRENCY_LIMITS = os.environ.get("TOOL_CONCURRENCY_LIMITS", "")
+
+
+def parse_limits(value: str) -> dict[str, int]:
+    limits = {}
+    for item in value.split(","):
+        if "=" in item:
+            name, limit = item.split("=", 1)
+            limits[name.strip()] = int(limit)
+    return limits
+
+
+def base_tool_name(tool_name: str) -> str:
+    """Gateway tools are named <target>___<tool>, limits use the tool part."""
+    delimiter = "___"
+    if delimiter in tool_name:
+        return tool_name[tool_name.index(delimiter) + len(delimiter) :]
+    return tool_name
+
+
+# Per-tool semaphores by event loop, shared by the executors of every agent in the process
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Semaphore]]" = (
+    weakref.WeakKeyDictionary()
+)
+_semaphores_lock = threading.Lock()
+
+
+def tool_semaphore(name: str, limit: int) -> asyncio.Semaphore:
+    """The process-wide semaphore capping calls of tool `name` on the running loop."""
+    loop = asyncio.get_running_loop()
+    with _semaphores_lock:
+        semaphores = _semaphores.setdefault(loop, {})
+        semaphore = semaphores.get(name)
+        if semaphore is None:
+            semaphore = semaphores[name] = asyncio.Semaphore(limit)
+        return semaphore
+
+
+class CappedConcurrentToolExecutor(ConcurrentToolExecutor):
+    """ConcurrentToolExecutor with a process-wide cap on concurrent calls of each tool."""
+
+    def __init__(self, default_limit: int = TOOL_CONCURRENCY_DEFAULT, limits: dict[str, int] | None = None):
+        """
+        Args:
+            default_limit: Concurrent calls allowed per tool across all requests.
+            limits: Per tool overrides of default_limit, keyed by tool name.
+        """
+        super().__init__()
+        self.default_limit = default_limit
+        self.limits = limits if limits is not None else parse_limits(TOOL_CONCURRENCY_LIMITS)
+
+    async def _task(self, agent, tool_use: ToolUse, *args: Any, **kwargs: Any) -> None:
+        name = base_tool_name(tool_use["name"])
+        async with tool_semaphore(name, self.limits.get(name, self.default_limit)):
+            await super()._task(agent, tool_use, *args, **kwargs)
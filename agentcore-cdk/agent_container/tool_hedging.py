@@ -0,0 +1,184 @@
+"""
+Hedged, deadline-aware gateway tool calls.
+
+A gateway call that lands on a cold Lambda can take seconds while warm calls
+take tens of milliseconds. For tools listed in TOOL_HEDGING (idempotent
+reads such as `aws_blogs_search` and `web_extract`), HedgedMCPAgentTool sends
+a second, identical call once the first has been running longer than the
+tool's recent p95 latency, keeps whichever succeeds first and cancels the
+other. Until a tool has TOOL_HEDGE_MIN_SAMPLES latency samples the delay is
+TOOL_HEDGE_DELAY_MS.
+
+Every call, hedged or not, is also bounded by the invocation deadline the
+entrypoint passes in the invocation state: the MCP read timeout is capped to
+the remaining budget, and once the budget is spent the call is not sent.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from datetime import timedelta
+from typing import Any
+
+from strands.tools.mcp.mcp_agent_tool import MCPAgentTool
+from strands.types._events import ToolResultEvent
+from strands.types.tools import ToolGenerator, ToolResult, ToolUse
+
+from telemetry import meter
+from tool_executor import base_tool_name
+
+
+# Tool names (without the <target>___ prefix) that may be hedged, e.g. "aws_blogs_search,web_extract"
+TOOL_HEDGING = frozenset(name.strip() for name in os.environ.get("TOOL_HEDGING", "").split(",") if name.strip())
+TOOL_HEDGE_DELAY_MS = float(os.environ.get("TOOL_HEDGE_DELAY_MS", 1000))
+TOOL_HEDGE_MIN_DELAY_MS = float(os.environ.get("TOOL_HEDGE_MIN_DELAY_MS", 50))
+TOOL_HEDGE_MIN_SAMPLES = int(os.environ.get("TOOL_HEDGE_MIN_SAMPLES", 20))
+# Seconds between checks of the agent's cancel signal during a hedged call
+CANCEL_POLL_INTERVAL = 0.05
+
+hedges = meter.create_counter("agent.tool.hedges", description="Hedged tool calls sent, by winning attempt")
+deadline_skips = meter.create_counter(
+    "agent.tool.deadline_skipped", description="Tool calls not sent because the invocation deadline had passed"
+)
+
+
+class LatencyTracker:
+    """Recent successful call latencies per tool."""
+
+    def __init__(self, window: int = 200, min_samples: int = TOOL_HEDGE_MIN_SAMPLES):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def record(self, tool_name: str, seconds: float):
+        with self._lock:
+            samples = self._samples.get(tool_name)
+            if samples is None:
+                samples = self._samples[tool_name] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def percentile(self, tool_name: str, percent: float) -> float | None:
+        """The given latency percentile in seconds, None until there are enough samples."""
+        with self._lock:
+            samples = sorted(self._samples.get(tool_name, ()))
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * percent / 100))]
+
+
+latency_tracker = LatencyTracker()
+
+
+class HedgedMCPAgentTool(MCPAgentTool):
+    """MCPAgentTool with deadline-capped timeouts and optional hedging."""
+
+    def __init__(self, mcp_tool, mcp_client, hedge: bool | None = None, **kwargs: Any):
+        """
+        Args:
+            mcp_tool: The MCP tool definition.
+            mcp_client: The started MCP client to call it on.
+            hedge: Hedge this tool, by default when its name is in TOOL_HEDGING.
+            **kwargs: Passed on to MCPAgentTool (name_override, timeout).
+        """
+        super().__init__(mcp_tool, mcp_client, **kwargs)
+        self.base_name = base_tool_name(mcp_tool.name)
+        self.hedge = self.base_name in TOOL_HEDGING if hedge is None else hedge
+
+    def hedge_delay(self) -> float:
+        p95 = latency_tracker.percentile(self.base_name, 95)
+        delay = p95 if p95 is not None else TOOL_HEDGE_DELAY_MS / 1000
+        return max(delay, TOOL_HEDGE_MIN_DELAY_MS / 1000)
+
+    def read_timeout(self, deadline: float | None) -> timedelta | None:
+        """The tool timeout, capped to what is left of the invocation budget."""
+        if deadline is None:
+            return self.timeout
+        remaining = timedelta(seconds=deadline - time.monotonic())
+        return min(self.timeout, remaining) if self.timeout is not None else remaining
+
+    async def call(self, tool_use: ToolUse, deadline: float | None, cancel_signal: threading.Event | None):
+        started = time.monotonic()
+        result = await self.mcp_client.call_tool_async(
+            tool_use_id=tool_use["toolUseId"],
+            name=self.mcp_tool.name,
+            arguments=tool_use["input"],
+            read_timeout_seconds=self.read_timeout(deadline),
+            cancel_signal=cancel_signal,
+        )
+        if result["status"] == "success":
+            latency_tracker.record(self.base_name, time.monotonic() - started)
+        return result
+
+    async def hedged_call(
+        self, tool_use: ToolUse, deadline: float | None, agent_cancel: threading.Event | None
+    ) -> ToolResult:
+        attempts = {}
+
+        def start(attempt: str):
+            # Each attempt has its own signal, so the loser can be cancelled alone
+            cancel_signal = threading.Event()
+            if agent_cancel is not None and agent_cancel.is_set():
+                cancel_signal.set()
+            task = asyncio.ensure_future(self.call(tool_use, deadline, cancel_signal))
+            attempts[task] = (attempt, cancel_signal)
+
+        async def forward_cancel():
+            # threading.Event has no async hook; poll it like the MCP client does
+            while not agent_cancel.is_set():
+                await asyncio.sleep(CANCEL_POLL_INTERVAL)
+            for _, cancel_signal in attempts.values():
+                cancel_signal.set()
+
+        watcher = asyncio.ensure_future(forward_cancel()) if agent_cancel is not None else None
+        start("primary")
+        pending = set(attempts)
+        try:
+            done, _ = await asyncio.wait(attempts, timeout=self.hedge_delay())
+            cancelled = agent_cancel is not None and agent_cancel.is_set()
+            if not done and not cancelled and (deadline is None or deadline > time.monotonic()):
+                start("hedge")
+            pending = set(attempts)
+
+            # First success wins; an error only counts once the other attempt has failed too
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                task = next((task for task in done if task.result()["status"] == "success"), next(iter(done)))
+                if task.result()["status"] == "success" or not pending:
+                    break
+            if len(attempts) > 1:
+                hedges.add(1, {"tool": self.base_name, "winner": attempts[task][0]})
+            return task.result()
+        except asyncio.CancelledError:
+            for task in pending:
+                task.cancel()
+            raise
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+            for task in pending:
+                # The MCP client sends a cancellation for the slower call, its result is dropped
+                attempts[task][1].set()
+                task.add_done_callback(lambda task: task.cancelled() or task.exception())
+
+    async def stream(self, tool_use: ToolUse, invocation_state: dict[str, Any], **kwargs: Any) -> ToolGenerator:
+        deadline = invocation_state.get("deadline")
+        if deadline is not None and deadline <= time.monotonic():
+            deadline_skips.add(1, {"tool": self.base_name})
+            yield ToolResultEvent(
+                {
+                    "toolUseId": tool_use["toolUseId"],
+                    "status": "error",
+                    "content": [{"text": "Tool call skipped: the time budget for this request is used up."}],
+                }
+            )
+            return
+
+        agent_cancel = getattr(invocation_state.get("agent"), "_cancel_signal", None)
+        if self.hedge:
+            result = await self.hedged_call(tool_use, deadline, agent_cancel)
+        else:
+            result = await self.call(tool_use, deadline, agent_cancel)
+        yield ToolResultEvent(result)
@@ -0,0 +1,213 @@
+"""
+Benchmark: web_extract page-to-text throughput and peak RSS.
+
+Serves a corpus of saved HTML pages from a local HTTP server and extracts
+each of them with:
+
+- baseline: requests' response.text + BeautifulSoup(html, "html.parser").get_text(),
+  what bs4_extract did before;
+- stream: bs4_extract.get_text_from_url, streaming into html_text's parser
+  (stdlib html.parser);
+- stream-lxml: the same with lxml, when it is installed.
+
+Every variant runs in its own process, so the reported peak RSS (ru_maxrss
+minus the RSS after imports) is its own. The Lambda has 512 MB.
+
+By default the corpus is five synthetic blog-like pages of 50 KB to 4 MB,
+generated from fixed seeds into a temporary directory, so every run and
+every machine extracts the same bytes; its SHA-256 is printed with the
+results. --corpus DIR benchmarks a directory of saved .html pages instead,
+--save URL [URL ...] downloads pages into it first (default
+benchmarks/web_corpus, which is gitignored).
+
+Run from the agentcore-cdk directory:
+
+    python benchmarks/bench_html_extract.py --rounds 5
+    python benchmarks/bench_html_extract.py --corpus benchmarks/web_corpus --save https://aws.amazon.com/blogs/aws/some-post/
+"""
+
+import argparse
+import hashlib
+import http.server
+import json
+import os
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "lambdas", "code", "web_extract"))
+
+DEFAULT_CORPUS = os.path.join(BENCH_DIR, "web_corpus")
+SYNTHETIC_SIZES = [50_000, 150_000, 400_000, 1_000_000, 4_000_000]
+
+
+def synthetic_page(size: int, seed: int) -> str:
+    """A page shaped like an AWS blog post: heavy head, nav, inline scripts, article, footer."""
+    rng = random.Random(seed)
+    words = "agent runtime gateway lambda bedrock model tool latency deploy container memory".split()
+
+    def sentence():
+        return " ".join(rng.choice(words) for _ in range(rng.randint(8, 20))).capitalize() + "."
+
+    head = "<head><title>Post</title>" + "<style>" + ".c{color:#000}" * 400 + "</style></head>"
+    nav = "<nav><ul>" + "".join(f'<li><a href="/p/{i}">Link {i}</a></li>' for i in range(300)) + "</ul></nav>"
+    script = "<script>window.data = " + json.dumps({"k": ["v" * 40] * 200}) + ";</script>"
+    footer = "<footer>" + "<p>Legal notice &copy; terms &amp; privacy.</p>" * 20 + "</footer>"
+    parts = [f"<!DOCTYPE html><html>{head}<body>{nav}{script}<article><h1>Title</h1>"]
+    length = sum(map(len, parts))
+    while length < size:
+        block = f"<p>{' '.join(sentence() for _ in range(5))}</p>"
+        if rng.random() < 0.1:
+            block += script
+        parts.append(block)
+        length += len(block)
+    parts.append(f"</article>{footer}</body></html>")
+    return "".join(parts)
+
+
+def write_synthetic_corpus(corpus: str):
+    for i, size in enumerate(SYNTHETIC_SIZES):
+        with open(os.path.join(corpus, f"synthetic-{size // 1000}k.html"), "w") as f:
+            f.write(synthetic_page(size, seed=i))
+
+
+def corpus_digest(corpus: str, pages: list[str]) -> str:
+    digest = hashlib.sha256()
+    for page in pages:
+        with open(os.path.join(corpus, page), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+
+def save_pages(corpus: str, save: list[str]):
+    os.makedirs(corpus, exist_ok=True)
+    if save:
+        import requests
+
+        for url in save:
+            name = url.rstrip("/").rsplit("/", 1)[-1] or "index"
+            response = requests.get(url, timeout=30)
+            response.raise_for_status()
+            with open(os.path.join(corpus, f"{name}.html"), "wb") as f:
+                f.write(response.content)
+            print(f"saved {url} ({len(response.content)} bytes)")
+
+
+def list_pages(corpus: str) -> list[str]:
+    return sorted(name for name in os.listdir(corpus) if name.endswith(".html"))
+
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def rss_kib() -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def worker(variant: str, base_url: str, pages: list[str], rounds: int):
+    """Runs in a child process, prints one JSON line."""
+    import requests
+    from bs4 import BeautifulSoup
+
+    import bs4_extract
+    import html_text
+    from content_cache import ContentCache
+
+    # Measure fetching and parsing, not the content cache
+    bs4_extract.content_cache = ContentCache()
+
+    def baseline(url):
+        response = requests.get(url, timeout=30)
+        response.raise_for_status()
+        return BeautifulSoup(response.text, "html.parser").get_text()
+
+    if variant == "baseline":
+        extract = baseline
+    else:
+        html_text.LXML_AVAILABLE = variant == "stream-lxml"
+        extract = bs4_extract.get_text_from_url
+
+    before = rss_kib()
+    text_chars, times = {}, []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for page in pages:
+            text_chars[page] = len(extract(f"{base_url}/{page}"))
+        times.append(time.perf_counter() - started)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"seconds": statistics.median(times), "peak_rss_kib": peak - before, "text_chars": text_chars}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--corpus", help="Directory of saved .html pages instead of the synthetic corpus")
+    parser.add_argument("--save", nargs="*", default=[], help=f"Download these URLs into --corpus (default {DEFAULT_CORPUS}) first")
+    parser.add_argument("--rounds", type=int, default=3, help="Passes over the corpus, the median is reported")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--base-url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.base_url, list_pages(args.corpus), args.rounds)
+        return
+
+    if args.save:
+        args.corpus = args.corpus or DEFAULT_CORPUS
+        save_pages(args.corpus, args.save)
+    if args.corpus:
+        pages = list_pages(args.corpus)
+        if not pages:
+            parser.error(f"no .html pages in {args.corpus}")
+        corpus_name = args.corpus
+    else:
+        synthetic_dir = tempfile.TemporaryDirectory(prefix="web_corpus-")
+        args.corpus = synthetic_dir.name
+        write_synthetic_corpus(args.corpus)
+        pages = list_pages(args.corpus)
+        corpus_name = "synthetic"
+    corpus_bytes = sum(os.path.getsize(os.path.join(args.corpus, page)) for page in pages)
+
+    server = http.server.ThreadingHTTPServer(
+        ("127.0.0.1", 0), lambda *a, **kw: QuietHandler(*a, directory=args.corpus, **kw)
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    import html_text
+
+    variants = ["baseline", "stream"] + (["stream-lxml"] if html_text.LXML_AVAILABLE else [])
+    print(
+        f"corpus {corpus_name} (sha256 {corpus_digest(args.corpus, pages)}): "
+        f"{len(pages)} pages, {corpus_bytes / 1e6:.1f} MB, {args.rounds} rounds\n"
+    )
+    print(f"{'variant':<14}{'pages/s':>9}{'MB/s':>8}{'peak RSS MB':>13}{'text KB':>10}")
+    try:
+        for variant in variants:
+            output = subprocess.run(
+                [sys.executable, __file__, "--worker", variant, "--base-url", base_url, "--corpus", args.corpus,
+                 "--rounds", str(args.rounds)],
+                check=True, capture_output=True, text=True,
+            ).stdout  # fmt: skip
+            result = json.loads(output.strip().splitlines()[-1])
+            print(
+                f"{variant:<14}{len(pages) / result['seconds']:>9.1f}{corpus_bytes / 1e6 / result['seconds']:>8.1f}"
+                f"{result['peak_rss_kib'] / 1024:>13.1f}{sum(result['text_chars'].values()) / 1000:>10.0f}"
+            )
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
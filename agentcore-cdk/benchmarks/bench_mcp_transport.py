@@ -0,0 +1,271 @@
+"""
+Transport benchmark: the cost of the MCP + SigV4 layer without a model.
+
+Starts the local fake gateway (benchmarks/fake_mcp_gateway.py) and drives it
+in two modes:
+
+- transport: StreamableHTTPTransportWithSigV4 with raw JSON-RPC tools/call
+  messages, i.e. signing, HTTP and SSE parsing only;
+- client: streamablehttp_client_with_sigv4 with an mcp ClientSession, the
+  stack strands' MCPClient uses.
+
+Each round runs SESSIONS concurrent sessions sending MESSAGES sequential
+tool calls each, after one warm-up round. HTTP/1.1 is the default, HTTP/2
+(--http 2 or --http 1.1,2) is opt-in. A round that errors or runs past
+--timeout seconds fails its variant, which is reported and skipped. Reported per mode and HTTP
+version: throughput (median of rounds), latency p50/p95/p99 over all
+rounds, TCP connections, requests rejected by SigV4 verification, and
+tracemalloc figures from a separate traced round: peak traced memory per
+session and memory retained per message (a leak indicator).
+
+Run from the agentcore-cdk directory, e.g.:
+
+    python benchmarks/bench_mcp_transport.py --sessions 20 --messages 50 --latency-ms 5 --verify-sigv4
+    python benchmarks/bench_mcp_transport.py --json before.json
+    python benchmarks/bench_mcp_transport.py --compare before.json
+
+Needs hypercorn, trustme and h2.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+import warnings
+from contextlib import asynccontextmanager
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "agent_container"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import anyio  # noqa: E402
+from botocore.credentials import Credentials  # noqa: E402
+from mcp import ClientSession  # noqa: E402
+from mcp.shared.message import SessionMessage  # noqa: E402
+from mcp.types import (  # noqa: E402
+    LATEST_PROTOCOL_VERSION,
+    JSONRPCMessage,
+    JSONRPCNotification,
+    JSONRPCRequest,
+)
+
+from fake_mcp_gateway import FakeGateway  # noqa: E402
+from streamable_http_sigv4 import (  # noqa: E402
+    PerLoopHTTPClientFactory,
+    SigV4HTTPXAuth,
+    StreamableHTTPTransportWithSigV4,
+    streamablehttp_client_with_sigv4,
+)
+
+CREDENTIALS = Credentials("AKIDEXAMPLE", "wJalrXUtnFEMI/K7MDENG+bPxRfiCYEXAMPLEKEY", "FwoGZXIvYXdzEXAMPLETOKEN")
+SERVICE = "bedrock-agentcore"
+REGION = "us-east-1"
+
+
+@asynccontextmanager
+async def open_transport(url: str, factory):
+    """What streamablehttp_client does, around StreamableHTTPTransportWithSigV4."""
+    with warnings.catch_warnings():
+        # Recent mcp versions take headers and auth from the httpx client instead
+        warnings.simplefilter("ignore", DeprecationWarning)
+        transport = StreamableHTTPTransportWithSigV4(url, CREDENTIALS, SERVICE, REGION)
+    client = factory(auth=SigV4HTTPXAuth(transport.credentials, transport.service, transport.region))
+    read_stream_writer, read_stream = anyio.create_memory_object_stream(0)
+    write_stream, write_stream_reader = anyio.create_memory_object_stream(0)
+
+    async with client, anyio.create_task_group() as tg:
+
+        def start_get_stream():
+            tg.start_soon(transport.handle_get_stream, client, read_stream_writer)
+
+        tg.start_soon(
+            transport.post_writer, client, write_stream_reader, read_stream_writer, write_stream, start_get_stream, tg
+        )
+        try:
+            yield read_stream, write_stream
+        finally:
+            if transport.session_id:
+                await transport.terminate_session(client)
+            tg.cancel_scope.cancel()
+
+
+async def rpc(read_stream, write_stream, request_id: int, method: str, params: dict):
+    await write_stream.send(
+        SessionMessage(JSONRPCMessage(JSONRPCRequest(jsonrpc="2.0", id=request_id, method=method, params=params)))
+    )
+    while True:
+        message = await read_stream.receive()
+        if isinstance(message, Exception):
+            raise message
+        if getattr(message.message.root, "id", None) == request_id:
+            return message.message.root
+
+
+async def transport_session(url, factory, args, latencies):
+    async with open_transport(url, factory) as (read_stream, write_stream):
+        await rpc(
+            read_stream,
+            write_stream,
+            0,
+            "initialize",
+            {
+                "protocolVersion": LATEST_PROTOCOL_VERSION,
+                "capabilities": {},
+                "clientInfo": {"name": "bench", "version": "0"},
+            },
+        )
+        await write_stream.send(
+            SessionMessage(JSONRPCMessage(JSONRPCNotification(jsonrpc="2.0", method="notifications/initialized")))
+        )
+        text = "x" * args.request_bytes
+        for i in range(1, args.messages + 1):
+            started = time.perf_counter()
+            await rpc(read_stream, write_stream, i, "tools/call", {"name": "echo", "arguments": {"text": text}})
+            latencies.append(time.perf_counter() - started)
+
+
+async def client_session(url, factory, args, latencies):
+    async with streamablehttp_client_with_sigv4(
+        url=url, credentials=CREDENTIALS, service=SERVICE, region=REGION, httpx_client_factory=factory
+    ) as (read_stream, write_stream, _):
+        async with ClientSession(read_stream, write_stream) as session:
+            await session.initialize()
+            text = "x" * args.request_bytes
+            for _ in range(args.messages):
+                started = time.perf_counter()
+                await session.call_tool("echo", {"text": text})
+                latencies.append(time.perf_counter() - started)
+
+
+SESSIONS = {"transport": transport_session, "client": client_session}
+
+
+async def run_round(url, mode, factory, args):
+    latencies = []
+    started = time.perf_counter()
+    sessions = asyncio.gather(*(SESSIONS[mode](url, factory, args, latencies) for _ in range(args.sessions)))
+    await asyncio.wait_for(sessions, args.timeout)
+    return latencies, time.perf_counter() - started
+
+
+def traced_round(url, mode, factory, args):
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        asyncio.run(run_round(url, mode, factory, args))
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    messages = args.sessions * args.messages
+    return (peak - baseline) / 1024 / args.sessions, max(0, current - baseline) / messages
+
+
+def percentile(samples, p):
+    return statistics.quantiles(samples, n=100, method="inclusive")[p - 1] * 1000
+
+
+def run_variant(gateway, mode, http2, args):
+    factory = PerLoopHTTPClientFactory(http2=http2)
+    asyncio.run(run_round(gateway.url, mode, factory, args))
+    gateway.reset_counters()
+
+    latencies, rates = [], []
+    for _ in range(args.rounds):
+        round_latencies, seconds = asyncio.run(run_round(gateway.url, mode, factory, args))
+        latencies += round_latencies
+        rates.append(len(round_latencies) / seconds)
+    connections, rejected = gateway.connections, gateway.rejected
+    peak_kib, retained_bytes = traced_round(gateway.url, mode, factory, args)
+    return {
+        "variant": f"{mode} HTTP/{'2' if http2 else '1.1'}",
+        "msgs_per_s": statistics.median(rates),
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "connections": connections,
+        "rejected": rejected,
+        "peak_kib_per_session": peak_kib,
+        "retained_b_per_msg": retained_bytes,
+    }
+
+
+def print_results(results, baseline=None):
+    baseline = {result["variant"]: result for result in baseline or []}
+    print(
+        f"{'variant':<20}{'msgs/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+        f"{'conns':>7}{'403s':>6}{'peak KiB/sess':>15}{'kept B/msg':>12}"
+    )
+    for result in results:
+        print(
+            f"{result['variant']:<20}{result['msgs_per_s']:>9.0f}{result['p50_ms']:>9.2f}{result['p95_ms']:>9.2f}"
+            f"{result['p99_ms']:>9.2f}{result['connections']:>7}{result['rejected']:>6}"
+            f"{result['peak_kib_per_session']:>15.1f}{result['retained_b_per_msg']:>12.0f}"
+        )
+        before = baseline.get(result["variant"])
+        if before:
+            print(
+                f"{'  vs baseline':<20}{result['msgs_per_s'] / before['msgs_per_s']:>8.2f}x"
+                + "".join(f"{result[key] - before[key]:>+9.2f}" for key in ("p50_ms", "p95_ms", "p99_ms"))
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--mode", default="transport,client", help="Comma separated: transport, client")
+    parser.add_argument("--http", default="1.1", help="Comma separated HTTP versions: 1.1, 2 (opt-in)")
+    parser.add_argument("--sessions", type=int, default=10, help="Concurrent MCP sessions")
+    parser.add_argument("--messages", type=int, default=50, help="Tool calls per session and round")
+    parser.add_argument("--rounds", type=int, default=3, help="Measured rounds")
+    parser.add_argument("--timeout", type=float, default=120, help="Seconds a round may take before it fails")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Server-side latency of each tool call")
+    parser.add_argument("--payload-bytes", type=int, default=0, help="Extra bytes in each tool result")
+    parser.add_argument("--request-bytes", type=int, default=16, help="Bytes of text in each tool call")
+    parser.add_argument("--verify-sigv4", action="store_true", help="Verify every signature server-side")
+    parser.add_argument("--no-tls", action="store_true", help="Plain HTTP/1.1 instead of TLS")
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--compare", help="Compare with results written by --json")
+    args = parser.parse_args()
+
+    http_versions = ["1.1"] if args.no_tls else args.http.split(",")
+    print(
+        f"{args.sessions} sessions x {args.messages} calls x {args.rounds} rounds, "
+        f"latency {args.latency_ms} ms, result +{args.payload_bytes} B, request {args.request_bytes} B, "
+        f"SigV4 verification {'on' if args.verify_sigv4 else 'off'}, {'HTTP' if args.no_tls else 'TLS'}\n"
+    )
+
+    results, failed = [], []
+    with FakeGateway(
+        latency=args.latency_ms / 1000,
+        payload_bytes=args.payload_bytes,
+        credentials=CREDENTIALS if args.verify_sigv4 else None,
+        tls=not args.no_tls,
+    ) as gateway:
+        if gateway.ca_file:
+            os.environ["SSL_CERT_FILE"] = gateway.ca_file
+        for mode in args.mode.split(","):
+            for http_version in http_versions:
+                try:
+                    results.append(run_variant(gateway, mode, http_version == "2", args))
+                except Exception as e:
+                    # Report the failed variant and run the others
+                    failed.append(f"{mode} HTTP/{http_version}: {e!r}")
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+    print_results(results, baseline)
+    for failure in failed:
+        print(f"FAILED {failure}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""
+Benchmark: strands FileSessionManager vs. the append-log session store on
+200-turn sessions.
+
+Each turn writes a user and an assistant message and updates the agent
+record, which is what RepositorySessionManager does per turn. Reported:
+per-turn write latency (p50/p99) on the request path, and the time to load
+the session back (full history and the 40-message tail a sliding window
+conversation manager restores).
+
+Run from the agentcore-cdk directory:
+
+    python benchmarks/bench_session_store.py [turns]
+"""
+
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "agent_container"))
+
+from strands.session.file_session_manager import FileSessionManager  # noqa: E402
+from strands.types.session import Session, SessionAgent, SessionMessage, SessionType  # noqa: E402
+
+from session_store import AppendLogSessionRepository  # noqa: E402
+
+AGENT_ID = "default"
+ANSWER = "AgentCore Runtime hosts agents in isolated microVMs. " * 20
+
+
+def file_repository(storage_dir, session_id):
+    return FileSessionManager(session_id=session_id, storage_dir=storage_dir)
+
+
+def log_repository(storage_dir, session_id):
+    return AppendLogSessionRepository(storage_dir)
+
+
+def run_turns(repository, session_id, turns):
+    if repository.read_session(session_id) is None:
+        repository.create_session(Session(session_id=session_id, session_type=SessionType.AGENT))
+    agent = SessionAgent(agent_id=AGENT_ID, state={}, conversation_manager_state={})
+    repository.create_agent(session_id, agent)
+
+    latencies = []
+    for turn in range(turns):
+        started = time.perf_counter()
+        user = {"role": "user", "content": [{"text": f"question {turn}"}]}
+        assistant = {"role": "assistant", "content": [{"text": ANSWER}]}
+        repository.create_message(session_id, AGENT_ID, SessionMessage.from_message(user, 2 * turn))
+        repository.create_message(session_id, AGENT_ID, SessionMessage.from_message(assistant, 2 * turn + 1))
+        agent.state = {"turn": turn}
+        repository.update_agent(session_id, agent)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def load(repository, session_id, offset):
+    started = time.perf_counter()
+    repository.read_session(session_id)
+    repository.read_agent(session_id, AGENT_ID)
+    messages = repository.list_messages(session_id, AGENT_ID, offset=offset)
+    return time.perf_counter() - started, len(messages)
+
+
+def main():
+    turns = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    for name, make_repository in (("FileSessionManager", file_repository), ("AppendLog", log_repository)):
+        storage_dir = tempfile.mkdtemp()
+        session_id = "bench"
+        try:
+            repository = make_repository(storage_dir, session_id)
+            latencies = sorted(run_turns(repository, session_id, turns))
+            if hasattr(repository, "flush"):
+                repository.flush()
+
+            full, count = load(make_repository(storage_dir, session_id), session_id, 0)
+            tail, tail_count = load(make_repository(storage_dir, session_id), session_id, 2 * turns - 40)
+            print(
+                f"{name:<20} write p50 {statistics.median(latencies) * 1e3:7.3f} ms"
+                f"  p99 {latencies[int(len(latencies) * 0.99) - 1] * 1e3:7.3f} ms"
+                f"  load {count} msgs {full * 1e3:8.2f} ms"
+                f"  load tail {tail_count} msgs {tail * 1e3:8.2f} ms"
+            )
+        finally:
+            shutil.rmtree(storage_dir)
+
+
+if __name__ == "__main__":
+    main()
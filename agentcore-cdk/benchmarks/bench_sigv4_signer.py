@@ -0,0 +1,156 @@
+"""
+Micro-benchmark: SigV4Signer vs. the botocore AWSRequest + SigV4Auth path
+SigV4HTTPXAuth used before, on MCP-sized httpx requests.
+
+First checks that both produce byte-identical Authorization, X-Amz-Date and
+X-Amz-Security-Token headers (clock pinned, with and without a session
+token, with query strings, repeated and oddly spaced headers, Date header,
+empty and non-empty bodies, UNSIGNED-PAYLOAD), then reports signatures
+per second, and the cost of full vs. UNSIGNED-PAYLOAD signing for large
+base64 tool inputs.
+
+Run from the agentcore-cdk directory:
+
+    python benchmarks/bench_sigv4_signer.py
+"""
+
+import base64
+import datetime
+import json
+import os
+import sys
+import timeit
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "agent_container"))
+
+import httpx  # noqa: E402
+from botocore.auth import SIGV4_TIMESTAMP, SigV4Auth  # noqa: E402
+from botocore.awsrequest import AWSRequest  # noqa: E402
+from botocore.credentials import Credentials  # noqa: E402
+
+from streamable_http_sigv4 import SigV4Signer  # noqa: E402
+
+N = 20_000
+SERVICE = "bedrock-agentcore"
+REGION = "us-east-1"
+NOW = datetime.datetime(2025, 3, 14, 15, 9, 26)
+GATEWAY = "https://gw-abc123.gateway.bedrock-agentcore.us-east-1.amazonaws.com/mcp"
+
+MESSAGE = json.dumps(
+    {
+        "jsonrpc": "2.0",
+        "id": 7,
+        "method": "tools/call",
+        "params": {"name": "web-extract___web_extract", "arguments": {"urls": ["https://aws.amazon.com/blogs/"]}},
+    }
+).encode()
+
+CREDENTIALS = {
+    "session token": Credentials("AKIDEXAMPLE", "wJalrXUtnFEMI/K7MDENG+bPxRfiCYEXAMPLEKEY", "FwoGZXIvYXdzEXAMPLETOKEN"),
+    "no token": Credentials("AKIDEXAMPLE", "wJalrXUtnFEMI/K7MDENG+bPxRfiCYEXAMPLEKEY"),
+}
+
+
+def sample_requests():
+    base_headers = {
+        "accept": "application/json, text/event-stream",
+        "content-type": "application/json",
+        "mcp-session-id": "b3c1e2f0",
+        "connection": "keep-alive",
+    }
+    return {
+        "tools/call POST": lambda: httpx.Request("POST", GATEWAY, headers=base_headers, content=MESSAGE),
+        "SSE GET": lambda: httpx.Request("GET", GATEWAY, headers=base_headers),
+        "query string": lambda: httpx.Request("GET", GATEWAY + "?b=2&a=1&a=0&empty=", headers=base_headers),
+        "dot segments": lambda: httpx.Request("POST", GATEWAY.replace("/mcp", "/x/../mcp/"), content=MESSAGE),
+        "spaced + repeated headers": lambda: httpx.Request(
+            "POST",
+            GATEWAY,
+            headers=[("x-custom", "  a   b  "), ("x-custom", "c"), ("user-agent", "bench")],
+            content=MESSAGE,
+        ),
+        "date header": lambda: httpx.Request("POST", GATEWAY, headers={"date": "whatever"}, content=MESSAGE),
+        "content sha header": lambda: httpx.Request(
+            "POST", GATEWAY, headers={"x-amz-content-sha256": "UNSIGNED-PAYLOAD"}, content=MESSAGE
+        ),
+        "plain http": lambda: httpx.Request("POST", "http://localhost:8080/mcp", content=MESSAGE),
+    }
+
+
+def sign_with_botocore(request: httpx.Request, credentials: Credentials, unsigned_payload: bool = False):
+    """SigV4HTTPXAuth.auth_flow before SigV4Signer."""
+    headers = dict(request.headers)
+    headers.pop("connection", None)
+    aws_request = AWSRequest(method=request.method, url=str(request.url), data=request.content, headers=headers)
+    aws_request.context["payload_signing_enabled"] = not unsigned_payload
+    SigV4Auth(credentials, SERVICE, REGION).add_auth(aws_request)
+    request.headers.update(dict(aws_request.headers))
+
+
+SIGNED_HEADERS = ("authorization", "x-amz-date", "x-amz-security-token", "date", "x-amz-content-sha256")
+
+
+def check_parity():
+    timestamp = NOW.strftime(SIGV4_TIMESTAMP)
+    failures = 0
+    with mock.patch("botocore.auth.get_current_datetime", return_value=NOW):
+        for credentials_name, credentials in CREDENTIALS.items():
+            signer = SigV4Signer(credentials, SERVICE, REGION)
+            for request_name, make_request in sample_requests().items():
+                for unsigned_payload in (False, True):
+                    expected, actual = make_request(), make_request()
+                    sign_with_botocore(expected, credentials, unsigned_payload)
+                    signer.sign(actual, timestamp, unsigned_payload)
+                    for header in SIGNED_HEADERS:
+                        if expected.headers.get(header) != actual.headers.get(header):
+                            failures += 1
+                            print(f"MISMATCH {credentials_name} / {request_name} / {unsigned_payload=} / {header}")
+                            print(f"  botocore: {expected.headers.get(header)}")
+                            print(f"  signer:   {actual.headers.get(header)}")
+    total = len(CREDENTIALS) * len(sample_requests()) * 2
+    print(f"Parity: {total - failures} / {total} cases byte-identical")
+    return failures == 0
+
+
+def main():
+    if not check_parity():
+        sys.exit(1)
+
+    credentials = CREDENTIALS["session token"]
+    signer = SigV4Signer(credentials, SERVICE, REGION)
+
+    def make_request():
+        return httpx.Request(
+            "POST",
+            GATEWAY,
+            headers={"accept": "application/json, text/event-stream", "content-type": "application/json"},
+            content=MESSAGE,
+        )
+
+    print(f"\n{'signer':<28}{'sig/s':>10}{'us/sig':>10}")
+    baseline = None
+    for name, sign in [
+        ("botocore AWSRequest", lambda: sign_with_botocore(make_request(), credentials)),
+        ("SigV4Signer (cached key)", lambda: signer.sign(make_request())),
+        ("request construction only", make_request),
+    ]:
+        seconds = min(timeit.repeat(sign, number=N, repeat=3))
+        rate = N / seconds
+        baseline = baseline or rate
+        print(f"{name:<28}{rate:>10,.0f}{seconds / N * 1e6:>10.1f}   x{rate / baseline:.2f}")
+
+    print(f"\n{'tool input':<12}{'full signing':>14}{'unsigned':>12}")
+    for size_mb in (1, 4, 16):
+        blob = base64.b64encode(os.urandom(size_mb * 1024 * 1024 * 3 // 4)).decode()
+        body = json.dumps({"jsonrpc": "2.0", "id": 1, "method": "tools/call", "params": {"image": blob}}).encode()
+        request = httpx.Request("POST", GATEWAY, content=body)
+        timings = [
+            min(timeit.repeat(lambda: signer.sign(request, unsigned_payload=unsigned), number=20, repeat=3)) / 20
+            for unsigned in (False, True)
+        ]
+        print(f"{size_mb:>3} MB      {timings[0] * 1000:>11.2f}ms{timings[1] * 1000:>10.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Micro-benchmark: whitelist projection vs. the original delete-chain filter
+for streamed agent chunks, plus stdlib json vs. orjson/msgspec encoding.
+The shipped stream encodes with json.dumps; the orjson/msgspec row is for
+reference only, neither is a dependency of the agent container.
+
+Run from the agentcore-cdk directory:
+
+    python benchmarks/bench_stream_projection.py
+"""
+
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "agent_container"))
+
+from stream_projection import project_chunk  # noqa: E402
+
+N = 200_000
+
+
+def load_fast_dumps():
+    try:
+        import orjson
+
+        return orjson.dumps
+    except ImportError:
+        pass
+    try:
+        import msgspec
+
+        return msgspec.json.encode
+    except ImportError:
+        return None
+
+
+def legacy_filter(chunk):
+    """The filter AgentService.invoke_async used before the projection."""
+    if "agent" in chunk:
+        del chunk["agent"]
+    if "event_loop_cycle_id" in chunk:
+        del chunk["event_loop_cycle_id"]
+    if "event_loop_parent_cycle_id" in chunk:
+        del chunk["event_loop_parent_cycle_id"]
+    if "system_prompt" in chunk:
+        del chunk["system_prompt"]
+    if "model" in chunk:
+        del chunk["model"]
+    if "event_loop_cycle_trace" in chunk:
+        del chunk["event_loop_cycle_trace"]
+    if "event_loop_cycle_span" in chunk:
+        del chunk["event_loop_cycle_span"]
+    if "messages" in chunk:
+        del chunk["messages"]
+    if "tool_config" in chunk:
+        del chunk["tool_config"]
+
+    if chunk.get("delta", {}).get("toolUse"):
+        return None
+    if chunk.get("contentBlockDelta", {}).get("delta", {}).get("toolUse"):
+        return None
+    if chunk.get("event", {}).get("contentBlockDelta", {}).get("delta", {}).get("toolUse"):
+        return None
+    return chunk
+
+
+def text_delta_chunk():
+    """A text delta as strands yields it, merged with the invocation state."""
+    return {
+        "data": "token",
+        "delta": {"text": "token"},
+        "agent": object(),
+        "event_loop_cycle_id": "5f0c",
+        "event_loop_parent_cycle_id": "9a1b",
+        "system_prompt": "You are an AWS Expert...",
+        "model": object(),
+        "event_loop_cycle_trace": object(),
+        "event_loop_cycle_span": object(),
+        "messages": [],
+        "tool_config": {},
+        "request_state": {},
+    }
+
+
+def raw_event_chunk():
+    return {"event": {"contentBlockDelta": {"delta": {"text": "token"}, "contentBlockIndex": 0}}}
+
+
+def bench(label, fn, make_chunk):
+    chunks = [make_chunk() for _ in range(N)]
+    it = iter(chunks)
+    seconds = timeit.timeit(lambda: fn(next(it)), number=N)
+    print(f"{label:<40} {N / seconds / 1e6:6.2f} M chunks/s  {seconds / N * 1e9:7.1f} ns/chunk")
+
+
+def main():
+    for name, make_chunk in (("text delta", text_delta_chunk), ("raw model event", raw_event_chunk)):
+        bench(f"legacy filter ({name})", legacy_filter, make_chunk)
+        bench(f"projection ({name})", project_chunk, make_chunk)
+
+    bench("legacy filter + json.dumps", lambda c: json.dumps(legacy_filter(c), ensure_ascii=False), text_delta_chunk)
+    bench("projection + json.dumps", lambda c: json.dumps(project_chunk(c), ensure_ascii=False), text_delta_chunk)
+
+    projected = project_chunk(text_delta_chunk())
+    seconds = timeit.timeit(lambda: json.dumps(projected, ensure_ascii=False), number=N)
+    print(f"{'json.dumps':<40} {N / seconds / 1e6:6.2f} M chunks/s")
+    fast_dumps = load_fast_dumps()
+    if fast_dumps:
+        seconds = timeit.timeit(lambda: fast_dumps(projected), number=N)
+        print(f"{fast_dumps.__module__ + ' encoder (not shipped)':<40} {N / seconds / 1e6:6.2f} M chunks/s")
+    else:
+        print("orjson/msgspec not installed, skipping fast encoder")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+Local stand-in for an AgentCore gateway, for the transport benchmarks.
+
+Serves a streamable-HTTP MCP server (FastMCP) with an `echo` tool from a
+child process on 127.0.0.1, over TLS with HTTP/2 and HTTP/1.1 (throwaway CA
+from trustme) or plain HTTP. Options:
+
+- latency: seconds the echo tool waits before answering;
+- payload_bytes: extra bytes the echo tool adds to its answer;
+- credentials: when set, every request must carry a valid SigV4 signature
+  for them, recomputed with botocore; others get a 403.
+
+It counts the TCP connections clients open (one TLS handshake each) and the
+requests rejected by SigV4 verification.
+
+    with FakeGateway(latency=0.02, credentials=credentials) as gateway:
+        os.environ["SSL_CERT_FILE"] = gateway.ca_file
+        ... connect to gateway.url ...
+        print(gateway.connections, gateway.rejected)
+
+Requires: hypercorn, trustme (pip install hypercorn trustme h2).
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import re
+import socket
+import tempfile
+import time
+
+import trustme
+from botocore.auth import SigV4Auth
+from botocore.awsrequest import AWSRequest
+from botocore.credentials import Credentials
+from hypercorn.asyncio import serve
+from hypercorn.config import Config
+from mcp.server.fastmcp import FastMCP
+
+AUTHORIZATION = re.compile(
+    r"AWS4-HMAC-SHA256 Credential=(?P<access_key>[^/]+)/\d{8}/(?P<region>[^/]+)/(?P<service>[^/]+)/aws4_request, "
+    r"SignedHeaders=(?P<signed_headers>[^,]+), Signature=(?P<signature>[0-9a-f]{64})"
+)
+
+
+def create_mcp_server(latency: float = 0.0, payload_bytes: int = 0) -> FastMCP:
+    mcp = FastMCP("fake-gateway", log_level="WARNING")
+    payload = "x" * payload_bytes
+
+    @mcp.tool()
+    async def echo(text: str) -> str:
+        """Return the text unchanged."""
+        if latency:
+            await asyncio.sleep(latency)
+        return text + payload
+
+    return mcp
+
+
+class _ConnectionCounter:
+    """ASGI middleware counting distinct client sockets."""
+
+    def __init__(self, app, counter):
+        self.app = app
+        self.counter = counter
+        self.clients = set()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope.get("client") not in self.clients:
+            self.clients.add(scope.get("client"))
+            with self.counter.get_lock():
+                self.counter.value += 1
+        await self.app(scope, receive, send)
+
+
+class _SigV4Verifier:
+    """ASGI middleware rejecting requests without a valid SigV4 signature."""
+
+    def __init__(self, app, credentials: Credentials, rejected):
+        self.app = app
+        self.credentials = credentials
+        self.rejected = rejected
+
+    def verify(self, scope, body: bytes) -> bool:
+        headers = {}
+        for name, value in scope["headers"]:
+            name = name.decode().lower()
+            headers[name] = f"{headers[name]},{value.decode()}" if name in headers else value.decode()
+
+        match = AUTHORIZATION.fullmatch(headers.get("authorization", ""))
+        if match is None or match["access_key"] != self.credentials.access_key or "x-amz-date" not in headers:
+            return False
+
+        host = headers.get("host") or "{}:{}".format(*scope["server"])
+        url = f"{scope['scheme']}://{host}{scope['raw_path'].decode()}"
+        if scope["query_string"]:
+            url += f"?{scope['query_string'].decode()}"
+        request = AWSRequest(
+            method=scope["method"],
+            url=url,
+            data=body,
+            headers={name: headers.get(name, "") for name in match["signed_headers"].split(";") if name != "host"},
+        )
+        request.context["timestamp"] = headers["x-amz-date"]
+        signer = SigV4Auth(self.credentials, match["service"], match["region"])
+        string_to_sign = signer.string_to_sign(request, signer.canonical_request(request))
+        return signer.signature(string_to_sign, request) == match["signature"]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        messages = [await receive()]
+        while messages[-1]["type"] == "http.request" and messages[-1].get("more_body"):
+            messages.append(await receive())
+        body = b"".join(message.get("body", b"") for message in messages)
+
+        if not self.verify(scope, body):
+            with self.rejected.get_lock():
+                self.rejected.value += 1
+            await send({"type": "http.response.start", "status": 403, "headers": [(b"content-type", b"text/plain")]})
+            await send({"type": "http.response.body", "body": b"SigV4 signature mismatch"})
+            return
+
+        async def replay():
+            return messages.pop(0) if messages else await receive()
+
+        await self.app(scope, replay, send)
+
+
+def _serve(port, cert_file, key_file, latency, payload_bytes, credentials, counter, rejected):
+    # Clients dropping streams mid-response is expected here, keep the output readable
+    logging.disable(logging.ERROR)
+
+    config = Config()
+    config.bind = [f"127.0.0.1:{port}"]
+    if cert_file:
+        config.certfile = cert_file
+        config.keyfile = key_file
+        config.alpn_protocols = ["h2", "http/1.1"]
+    config.loglevel = "WARNING"
+    config.accesslog = None
+    config.keep_alive_timeout = 120
+    # hypercorn sends GOAWAY after 1000 requests by default
+    config.keep_alive_max_requests = 1_000_000
+
+    app = create_mcp_server(latency, payload_bytes).streamable_http_app()
+    if credentials is not None:
+        app = _SigV4Verifier(app, Credentials(*credentials), rejected)
+    app = _ConnectionCounter(app, counter)
+    asyncio.run(serve(app, config))
+
+
+class FakeGateway:
+    """MCP server in a child process, so it does not compete with the client for the GIL."""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        payload_bytes: int = 0,
+        credentials: Credentials | None = None,
+        tls: bool = True,
+    ):
+        self.latency = latency
+        self.payload_bytes = payload_bytes
+        self.credentials = credentials
+        self.tls = tls
+        self._counter = multiprocessing.Value("i", 0)
+        self._rejected = multiprocessing.Value("i", 0)
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self._process = None
+
+        self.ca_file = self._cert_file = self._key_file = None
+        if tls:
+            ca = trustme.CA()
+            cert = ca.issue_cert("127.0.0.1", "localhost")
+            self.ca_file = os.path.join(self._tmpdir.name, "ca.pem")
+            ca.cert_pem.write_to_path(self.ca_file)
+            self._cert_file = os.path.join(self._tmpdir.name, "cert.pem")
+            self._key_file = os.path.join(self._tmpdir.name, "key.pem")
+            cert.cert_chain_pems[0].write_to_path(self._cert_file)
+            cert.private_key_pem.write_to_path(self._key_file)
+
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            self.port = sock.getsockname()[1]
+        self.url = f"{'https' if tls else 'http'}://127.0.0.1:{self.port}/mcp"
+
+    @property
+    def connections(self) -> int:
+        return self._counter.value
+
+    @property
+    def rejected(self) -> int:
+        return self._rejected.value
+
+    def reset_counters(self):
+        for value in (self._counter, self._rejected):
+            with value.get_lock():
+                value.value = 0
+
+    def __enter__(self) -> "FakeGateway":
+        credentials = None
+        if self.credentials is not None:
+            frozen = self.credentials.get_frozen_credentials()
+            credentials = (frozen.access_key, frozen.secret_key, frozen.token)
+        self._process = multiprocessing.Process(
+            target=_serve,
+            args=(
+                self.port,
+                self._cert_file,
+                self._key_file,
+                self.latency,
+                self.payload_bytes,
+                credentials,
+                self._counter,
+                self._rejected,
+            ),
+            daemon=True,
+        )
+        self._process.start()
+        # Wait until hypercorn accepts connections
+        for _ in range(200):
+            try:
+                socket.create_connection(("127.0.0.1", self.port), timeout=0.1).close()
+                break
+            except OSError:
+                time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc_info):
+        self._process.terminate()
+        self._process.join(timeout=5)
+        self._tmpdir.cleanup()
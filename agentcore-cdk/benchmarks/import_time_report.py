@@ -0,0 +1,101 @@
+"""
+Import-time profile of the agent container.
+
+Runs `python -X importtime -c "import <module>"` inside agent_container and
+digests the output: total import time, the slowest top-level packages
+(cumulative) and the slowest individual modules (self time). Use --json to
+save the digest and --compare to diff it against a previous release.
+
+Run from the agentcore-cdk directory:
+
+    python benchmarks/import_time_report.py
+    python benchmarks/import_time_report.py --module agent_class --json import-time.json
+    python benchmarks/import_time_report.py --compare import-time.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+AGENT_CONTAINER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "agent_container")
+
+
+def run_importtime(module: str, env: dict) -> list[tuple[int, int, int, str]]:
+    """Return (self_us, cumulative_us, depth, module) for every import."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=AGENT_CONTAINER,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(self_us), int(cumulative_us), depth, name.strip()))
+    return rows
+
+
+def digest(rows, top: int) -> dict:
+    packages: dict[str, int] = {}
+    for self_us, _, _, name in rows:
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0) + self_us
+
+    return {
+        "total_ms": round(sum(self_us for self_us, _, _, _ in rows) / 1000, 1),
+        "modules_imported": len(rows),
+        "packages_ms": {
+            name: round(us / 1000, 1) for name, us in sorted(packages.items(), key=lambda kv: -kv[1])[:top]
+        },
+        "slowest_modules_ms": {
+            name: round(self_us / 1000, 1) for self_us, _, _, name in sorted(rows, key=lambda r: -r[0])[:top]
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="runtime_agent", help="module to import (default: runtime_agent)")
+    parser.add_argument("--top", type=int, default=15, help="entries per section")
+    parser.add_argument("--json", help="write the digest to this file")
+    parser.add_argument("--compare", help="previous digest to compare against")
+    args = parser.parse_args()
+
+    # The report is about imports only, keep background warm-up out of it
+    env = dict(os.environ, AGENT_PREWARM="false")
+    report = digest(run_importtime(args.module, env), args.top)
+    report["module"] = args.module
+
+    print(f"import {args.module}: {report['total_ms']} ms, {report['modules_imported']} modules")
+    print("\nTop-level packages (self time summed):")
+    for name, ms in report["packages_ms"].items():
+        print(f"  {ms:8.1f} ms  {name}")
+    print("\nSlowest modules (self time):")
+    for name, ms in report["slowest_modules_ms"].items():
+        print(f"  {ms:8.1f} ms  {name}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+        print(f"\nTotal: {previous['total_ms']} ms -> {report['total_ms']} ms")
+        for name, ms in report["packages_ms"].items():
+            before = previous["packages_ms"].get(name)
+            if before is not None and before != ms:
+                print(f"  {name:<30} {before:8.1f} -> {ms:8.1f} ms")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
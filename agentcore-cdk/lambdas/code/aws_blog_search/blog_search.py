@@ -1,5 +1,24 @@
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
 import requests
 
+from search_cache import cache_key, create_search_cache, normalize_query
+
+# Seconds to wait for the search endpoint
+SEARCH_TIMEOUT = float(os.environ.get("SEARCH_TIMEOUT", 10))
+
+# Queries searched at most per call, and at the same time
+SEARCH_MAX_QUERIES = int(os.environ.get("SEARCH_MAX_QUERIES", 6))
+SEARCH_MAX_WORKERS = int(os.environ.get("SEARCH_MAX_WORKERS", 6))
+# Reciprocal rank fusion constant: higher values flatten the advantage of top ranks
+RRF_K = 60
+
+# Search results by (query, include_blog, page), kept across calls of a warm container
+search_cache = create_search_cache()
+
 
 def clean_result(result: dict) -> dict:
 
@@ -32,7 +51,14 @@ def clean_results(results: list) -> list:
 
     return filtered_hits
 
-def aws_blog_search(query: str, include_blog: list = [], page: int = 1) -> dict:
+def search_query(query: str, include_blog: list = [], page: int = 1, deadline: float | None = None) -> dict:
+    key = cache_key(query, include_blog, page)
+    cached = search_cache.get(key)
+    print(json.dumps({"search_cache": search_cache.stats()}))
+    if cached is not None:
+        print(f"Cache hit for {key}")
+        return {"results": [dict(result) for result in cached]}
+
     base_url = "https://aws.amazon.com/search/p/2013-01-01/search"
 
     start_value = (page - 1) * 25
@@ -55,17 +81,95 @@ def aws_blog_search(query: str, include_blog: list = [], page: int = 1) -> dict:
 
     print(q)
 
+    timeout = SEARCH_TIMEOUT
+    if deadline is not None:
+        timeout = min(timeout, deadline - time.monotonic())
+        if timeout <= 0:
+            return {"error": "Deadline exceeded before the search was sent", "results": []}
+
     try:
         final_url = f"{base_url}?q=({q})&{paging}&{options}&{return_type}"
         # print(final_url)
-        response = requests.get(final_url)
+        response = requests.get(final_url, timeout=timeout)
         response.raise_for_status()
         response_json = response.json()
         hits = response_json.get("hits", {}).get("hit", [])
         print(f"Found {len(hits)} results")
 
-        return {"results": clean_results(hits)}
+        results = clean_results(hits)
+        search_cache.put(key, results)
+        return {"results": results}
 
     except Exception as e:
         print(f"Error in search: {e}")
         return {"error": f"Error in search: {e}", "results": []}
+
+
+def merge_results(searches: list) -> list:
+    """
+    Merge the result lists of several queries: one entry per link, ranked by
+    reciprocal rank fusion (links found by several queries, or ranked high,
+    come first), with the queries that found each link and its rank in each.
+    """
+    merged = {}
+    for query, results in searches:
+        for rank, result in enumerate((result for result in results if result.get("link")), 1):
+            entry = merged.get(result["link"])
+            if entry is None:
+                entry = merged[result["link"]] = dict(result, score=0.0, found_by=[])
+            entry["score"] += 1 / (RRF_K + rank)
+            entry["found_by"].append({"query": query, "rank": rank})
+    ranked = sorted(merged.values(), key=lambda entry: -entry["score"])
+    for entry in ranked:
+        entry["score"] = round(entry["score"], 5)
+    return ranked
+
+
+def aws_blog_search(
+    query: str,
+    include_blog: list = [],
+    page: int = 1,
+    deadline: float | None = None,
+    queries: list[str] | None = None,
+) -> dict:
+    """
+    Search the AWS blogs for query, and for each of the additional queries.
+
+    With several queries they are searched concurrently (each through the
+    result cache) and the results are merged by link, ranked, with the
+    queries that found each result in `found_by`. Queries that failed or ran
+    out of time are listed in `errors`.
+    """
+    all_queries, seen = [], set()
+    for candidate in [query, *(queries or [])]:
+        if isinstance(candidate, str) and candidate.strip() and normalize_query(candidate) not in seen:
+            seen.add(normalize_query(candidate))
+            all_queries.append(candidate)
+    all_queries = all_queries[:SEARCH_MAX_QUERIES]
+    if not all_queries:
+        return {"error": "No search query given", "results": []}
+    if len(all_queries) == 1:
+        return search_query(all_queries[0], include_blog, page, deadline)
+
+    executor = ThreadPoolExecutor(max_workers=min(SEARCH_MAX_WORKERS, len(all_queries)))
+    futures = [executor.submit(search_query, q, include_blog, page, deadline) for q in all_queries]
+    timeout = None if deadline is None else max(0, deadline - time.monotonic())
+    _, not_done = wait(futures, timeout=timeout)
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    searches, errors = [], []
+    for q, future in zip(all_queries, futures):
+        if future in not_done:
+            errors.append({"query": q, "error": "Deadline exceeded"})
+            continue
+        response = future.result()
+        if "error" in response:
+            errors.append({"query": q, "error": response["error"]})
+        searches.append((q, response["results"]))
+
+    results = merge_results(searches)
+    print(f"Merged {sum(len(r) for _, r in searches)} results of {len(searches)} queries into {len(results)}")
+    response = {"results": results, "queries": all_queries}
+    if errors:
+        response["errors"] = errors
+    return response
@@ -1,5 +1,19 @@
+import os
+import time
+
 from blog_search import aws_blog_search
 
+# Seconds an aws_blogs_search call may take, and the time kept back to return the results
+SEARCH_CALL_BUDGET = float(os.environ.get("SEARCH_CALL_BUDGET", 30))
+DEADLINE_MARGIN = float(os.environ.get("DEADLINE_MARGIN", 2))
+
+
+def call_deadline(context, budget):
+    """time.monotonic() by which the handler should return: the budget, or sooner if the Lambda times out first."""
+    remaining = context.get_remaining_time_in_millis() / 1000 - DEADLINE_MARGIN
+    return time.monotonic() + max(0, min(budget, remaining))
+
+
 def lambda_handler(event: dict, context) -> dict:
 
     # event: The event schema should match whatever inputSchema you define for the target.
@@ -17,7 +31,8 @@ def lambda_handler(event: dict, context) -> dict:
     results = "no such tool"
 
     if toolName == 'aws_blogs_search':
-        results = aws_blog_search(**event)
+        # Set by the handler, not by the caller
+        results = aws_blog_search(**{**event, "deadline": call_deadline(context, SEARCH_CALL_BUDGET)})
     else:
         print ("Results:")
 
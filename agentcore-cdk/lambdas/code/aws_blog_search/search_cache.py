@@ -0,0 +1,177 @@
+"""
+TTL cache of aws_blog_search results.
+
+Keyed on (normalized query, include_blog set, page): the query is
+case-folded with whitespace collapsed, and the blog filter is order
+insensitive. Tiers, checked in order:
+
+- memory: LRU that lives as long as the warm container;
+- shared (optional): any object with get(key) -> (value, expires_at) or None
+  and put(key, value, expires_at),
+  set with SEARCH_SHARED_CACHE: "dynamodb:<table>" (partition key `key`,
+  with `expires_at` usable as the table's TTL attribute), or "dir:<path>"
+  for a local stand-in backed by a directory.
+
+Entries expire SEARCH_CACHE_TTL seconds after the search. Only successful
+searches are cached.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+SEARCH_CACHE_TTL = float(os.environ.get("SEARCH_CACHE_TTL", 600))
+SEARCH_CACHE_MAX_ENTRIES = int(os.environ.get("SEARCH_CACHE_MAX_ENTRIES", 512))
+SEARCH_SHARED_CACHE = os.environ.get("SEARCH_SHARED_CACHE", "")
+
+
+def normalize_query(query):
+    return " ".join(query.casefold().split())
+
+
+def cache_key(query, include_blog, page):
+    return json.dumps([normalize_query(query), sorted(set(include_blog or [])), int(page)])
+
+
+class MemoryCache:
+    def __init__(self, max_entries=SEARCH_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value, expires_at):
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class DirectoryCache:
+    """Local stand-in for the shared tier: one JSON file per key."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest() + ".json")
+
+    def get(self, key):
+        try:
+            with open(self.path(key)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("key") != key or entry["expires_at"] <= time.time():
+            return None
+        return entry["value"], entry["expires_at"]
+
+    def put(self, key, value, expires_at):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump({"key": key, "value": value, "expires_at": expires_at}, f)
+        os.replace(tmp_path, self.path(key))
+
+
+class DynamoDBCache:
+    """Shared tier in a DynamoDB table with `key` as partition key."""
+
+    def __init__(self, table_name):
+        import boto3
+
+        self.table = boto3.resource("dynamodb").Table(table_name)
+
+    def get(self, key):
+        item = self.table.get_item(Key={"key": key}).get("Item")
+        # DynamoDB deletes expired items lazily, so check the expiry here too
+        if item is None or int(item["expires_at"]) <= time.time():
+            return None
+        return json.loads(item["value"]), int(item["expires_at"])
+
+    def put(self, key, value, expires_at):
+        self.table.put_item(Item={"key": key, "value": json.dumps(value), "expires_at": int(expires_at)})
+
+
+def create_shared_cache(spec=SEARCH_SHARED_CACHE):
+    if not spec:
+        return None
+    kind, _, target = spec.partition(":")
+    if kind == "dynamodb":
+        return DynamoDBCache(target)
+    if kind == "dir":
+        return DirectoryCache(target)
+    raise ValueError(f"Unknown SEARCH_SHARED_CACHE: {spec}")
+
+
+class SearchCache:
+    def __init__(self, memory=None, shared=None, ttl=SEARCH_CACHE_TTL):
+        self.ttl = ttl
+        self.memory = memory
+        self.shared = shared
+        self.counters = dict.fromkeys(("memory_hit", "shared_hit", "miss", "error"), 0)
+        self._lock = threading.Lock()
+
+    def count(self, counter):
+        with self._lock:
+            self.counters[counter] += 1
+
+    def get(self, key):
+        if self.memory is not None:
+            value = self.memory.get(key)
+            if value is not None:
+                self.count("memory_hit")
+                return value
+        if self.shared is not None:
+            try:
+                entry = self.shared.get(key)
+            except Exception as e:
+                print(f"Shared search cache get failed: {e}")
+                self.count("error")
+                entry = None
+            if entry is not None:
+                self.count("shared_hit")
+                value, expires_at = entry
+                if self.memory is not None:
+                    self.memory.put(key, value, expires_at)
+                return value
+        self.count("miss")
+        return None
+
+    def put(self, key, value):
+        expires_at = time.time() + self.ttl
+        if self.memory is not None:
+            self.memory.put(key, value, expires_at)
+        if self.shared is not None:
+            try:
+                self.shared.put(key, value, expires_at)
+            except Exception as e:
+                print(f"Shared search cache put failed: {e}")
+                self.count("error")
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+        lookups = counters["memory_hit"] + counters["shared_hit"] + counters["miss"]
+        counters["hit_rate"] = round((lookups - counters["miss"]) / lookups, 3) if lookups else 0.0
+        return counters
+
+
+def create_search_cache():
+    return SearchCache(MemoryCache(), create_shared_cache())
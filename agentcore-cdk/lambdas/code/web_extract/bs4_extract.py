@@ -1,38 +1,223 @@
+import codecs
+import itertools
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urlsplit
 
 import requests
-from bs4 import BeautifulSoup
 
-                     
-def html_to_text(html):
-    soup = BeautifulSoup(html, "html.parser")
-    return soup.get_text()
+from content_cache import conditional_headers, create_content_cache
+from content_sniff import PDF, TEXT, reject_early, sniff
+from html_text import html_to_text, stream_to_text
+from pdf_text import stream_pdf_text
 
-def get_text_from_url(some_url):
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-    try:
-        response = requests.get(some_url, headers=headers, timeout=10)
+# URLs fetched at the same time per call, and at most per host
+EXTRACT_MAX_WORKERS = int(os.environ.get("EXTRACT_MAX_WORKERS", 8))
+EXTRACT_PER_HOST = int(os.environ.get("EXTRACT_PER_HOST", 2))
+EXTRACT_TIMEOUT = float(os.environ.get("EXTRACT_TIMEOUT", 10))
+# Bytes of a page read at most; the rest is not downloaded
+EXTRACT_MAX_BYTES = int(os.environ.get("EXTRACT_MAX_BYTES", 2 * 1024 * 1024))
+# Drop navigation, footers and other boilerplate blocks from the page text
+EXTRACT_MAIN_CONTENT = os.environ.get("EXTRACT_MAIN_CONTENT", "true").lower() == "true"
+# PDFs: bytes read at most, and pages extracted
+EXTRACT_PDF_MAX_BYTES = int(os.environ.get("EXTRACT_PDF_MAX_BYTES", 10 * 1024 * 1024))
+EXTRACT_PDF_MAX_PAGES = int(os.environ.get("EXTRACT_PDF_MAX_PAGES", 20))
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+
+class DeadlineExceeded(Exception):
+    """The call's deadline passed before the page was extracted."""
+
+
+# Extracted text by URL and extraction settings, kept across calls of a warm container
+content_cache = create_content_cache(
+    f"main_content={EXTRACT_MAIN_CONTENT} max_bytes={EXTRACT_MAX_BYTES} "
+    f"pdf_max_bytes={EXTRACT_PDF_MAX_BYTES} pdf_max_pages={EXTRACT_PDF_MAX_PAGES}"
+)
+
+# One requests.Session shared by the worker threads of every call, so connections
+# are reused across calls of a warm container; each host's urllib3 pool keeps up
+# to EXTRACT_MAX_WORKERS connections, one per concurrent worker
+_session = requests.Session()
+_session.headers.update(HEADERS)
+_adapter = requests.adapters.HTTPAdapter(pool_maxsize=EXTRACT_MAX_WORKERS)
+_session.mount("http://", _adapter)
+_session.mount("https://", _adapter)
+
+
+def get_session():
+    return _session
+
+
+def response_charset(response):
+    """The charset the server declared, None to let the parser decide."""
+    if "charset" in response.headers.get("Content-Type", "").lower():
+        return response.encoding
+    return None
+
+
+def read_chunks(response, stop=None):
+    for chunk in response.iter_content(chunk_size=64 * 1024):
+        if stop is not None and stop.is_set():
+            raise DeadlineExceeded("Deadline exceeded while downloading")
+        yield chunk
+
+
+def stream_plain_text(chunks, max_bytes, encoding=None):
+    decoder = codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+    parts, read = [], 0
+    for chunk in chunks:
+        chunk = chunk[: max_bytes - read]
+        read += len(chunk)
+        parts.append(decoder.decode(chunk))
+        if read >= max_bytes:
+            return "".join(parts), True
+    parts.append(decoder.decode(b"", final=True))
+    return "".join(parts), False
+
+
+def response_to_text(response, stop=None):
+    """
+    Text of a response by its kind: HTML, plain text or PDF. Unsupported or
+    oversized responses raise UnsupportedContent, from the headers when
+    possible, otherwise from the first chunk, before the body is downloaded.
+
+    Returns:
+        tuple: (text, truncated)
+    """
+    content_type = response.headers.get("Content-Type", "")
+    reject_early(content_type, response.headers.get("Content-Length"))
+    chunks = read_chunks(response, stop)
+    head = next(chunks, b"")
+    kind = sniff(content_type, head)
+    chunks = itertools.chain([head], chunks)
+
+    if kind == PDF:
+        return stream_pdf_text(chunks, EXTRACT_PDF_MAX_BYTES, EXTRACT_PDF_MAX_PAGES)
+    if kind == TEXT:
+        return stream_plain_text(chunks, EXTRACT_MAX_BYTES, response_charset(response))
+    return stream_to_text(chunks, EXTRACT_MAX_BYTES, response_charset(response), main_content=EXTRACT_MAIN_CONTENT)
+
+
+def get_text_from_url(some_url, cached=None, timeout=EXTRACT_TIMEOUT, stop=None):
+    """
+    Stream a page into the matching extractor and return its text, reading
+    at most EXTRACT_MAX_BYTES (EXTRACT_PDF_MAX_BYTES for PDFs), and store it
+    in the content cache. With a stale cached entry the request is
+    conditional and a 304 returns the cached text. Setting the stop event
+    aborts the download between chunks.
+    Raises requests.RequestException, UnsupportedContent or DeadlineExceeded on failure.
+    """
+    headers = conditional_headers(cached) if cached else {}
+    with get_session().get(some_url, headers=headers, timeout=timeout, stream=True) as response:
+        if cached and response.status_code == 304:
+            content_cache.count("revalidated")
+            content_cache.store(
+                some_url,
+                cached["text"],
+                response.headers.get("ETag", cached.get("etag")),
+                response.headers.get("Last-Modified", cached.get("last_modified")),
+            )
+            return cached["text"]
         response.raise_for_status()
-        html = response.text
-        text = html_to_text(html)
-        return text
-    except requests.RequestException as e:
-        print(f"Error fetching {some_url}: {e}")
-        return ""
+        text, truncated = response_to_text(response, stop)
+        content_cache.count("changed" if cached else "miss")
+        content_cache.store(some_url, text, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+    if truncated:
+        print(f"{some_url}: stopped reading at the size or page limit")
+    return text
+
+
+class HostLimiter:
+    """Caps the requests in flight to each host."""
+
+    def __init__(self, per_host=EXTRACT_PER_HOST):
+        self.per_host = per_host
+        self._semaphores = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, url):
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            semaphore = self._semaphores.get(host)
+            if semaphore is None:
+                semaphore = self._semaphores[host] = threading.BoundedSemaphore(self.per_host)
+        return semaphore
+
+
+def remaining(deadline):
+    """Seconds left until deadline (a time.monotonic() value), None without one."""
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def fetch(url, host_limiter, deadline=None, stop=None):
+    cached = content_cache.lookup(url)
+    if cached and content_cache.fresh(cached):
+        content_cache.count("hit")
+        return cached["text"]
+    print(f"extracting url: {url}")
+    semaphore = host_limiter(url)
+    left = remaining(deadline)
+    if not semaphore.acquire(timeout=None if left is None else max(0, left)):
+        raise DeadlineExceeded("Deadline exceeded waiting for the host")
+    try:
+        left = remaining(deadline)
+        if left is not None and left <= 0 or stop is not None and stop.is_set():
+            raise DeadlineExceeded("Deadline exceeded before the request was sent")
+        timeout = EXTRACT_TIMEOUT if left is None else min(EXTRACT_TIMEOUT, left)
+        return get_text_from_url(url, cached, timeout, stop)
+    finally:
+        semaphore.release()
 
 
+def extract(urls, deadline=None):
+    """
+    Fetch the URLs concurrently, at most EXTRACT_MAX_WORKERS at a time and
+    EXTRACT_PER_HOST per host. Results keep the order of `urls`; URLs that
+    could not be fetched are listed in failed_results with the error.
 
-def extract(urls):
-    results = []
-    for url in urls:
-        print (f"extracting url: {url}")
-        raw_content = get_text_from_url(url)
-        print (f"parsing content")
-        parsed_content = raw_content #llm_parse_website(raw_content)
-        results.append({"url": url, "raw_content": parsed_content, "images": []})
-    return {"results": results, "failed_results": [], "response_time": 0}
+    With a deadline (a time.monotonic() value), URLs not finished by then are
+    abandoned: downloads stop at the next chunk, queued URLs are not started,
+    and they are listed in failed_results while the finished ones are returned.
+    """
+    started = time.perf_counter()
+    counters_before = content_cache.snapshot()
+    host_limiter = HostLimiter()
+    results, failed_results = [], []
 
+    if urls:
+        stop = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=min(EXTRACT_MAX_WORKERS, len(urls)))
+        futures = [executor.submit(fetch, url, host_limiter, deadline, stop) for url in urls]
+        left = remaining(deadline)
+        _, not_done = wait(futures, timeout=None if left is None else max(0, left))
+        if not_done:
+            stop.set()
+        # Do not wait for abandoned downloads, they end on their own at the next chunk or timeout
+        executor.shutdown(wait=False, cancel_futures=True)
 
-    
+        for url, future in zip(urls, futures):
+            if future in not_done:
+                print(f"Deadline exceeded for {url}")
+                failed_results.append({"url": url, "error": "Deadline exceeded, not extracted in time"})
+                continue
+            try:
+                raw_content = future.result()
+            except Exception as e:
+                print(f"Error fetching {url}: {e}")
+                failed_results.append({"url": url, "error": str(e)})
+                continue
+            parsed_content = raw_content #llm_parse_website(raw_content)
+            results.append({"url": url, "raw_content": parsed_content, "images": []})
 
+    response_time = round(time.perf_counter() - started, 3)
+    print(f"extracted {len(results)} urls, {len(failed_results)} failed in {response_time}s")
+    counters = content_cache.snapshot()
+    print(json.dumps({"content_cache": {key: counters[key] - counters_before[key] for key in counters}}))
+    return {"results": results, "failed_results": failed_results, "response_time": response_time}
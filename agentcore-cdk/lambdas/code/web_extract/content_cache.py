@@ -0,0 +1,215 @@
+"""
+Cache of extracted page text for the WebExtract Lambda, keyed on the URL
+and the extraction settings (a "variant" such as the byte limits and
+main-content mode), so changing a setting does not serve text extracted
+the old way.
+
+Tiers, checked in order, with hits copied into the faster tiers:
+
+- memory: LRU that lives as long as the warm container;
+- disk: JSON files under /tmp, which survive handler calls on the same container;
+- shared (optional): any object with get(key) and put(key, entry), set with
+  EXTRACT_SHARED_CACHE: "dynamodb:<table>" (partition key `url`, holding the
+  cache key), or
+  "dir:<path>" for a local stand-in backed by a directory.
+
+An entry younger than EXTRACT_CACHE_TTL is served as is. An older one is
+revalidated with a conditional GET (If-None-Match / If-Modified-Since); a
+304 keeps the cached text and restarts its TTL.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+EXTRACT_CACHE_TTL = float(os.environ.get("EXTRACT_CACHE_TTL", 3600))
+EXTRACT_CACHE_MAX_ENTRIES = int(os.environ.get("EXTRACT_CACHE_MAX_ENTRIES", 256))
+EXTRACT_CACHE_DIR = os.environ.get("EXTRACT_CACHE_DIR", "/tmp/web_extract_cache")
+EXTRACT_CACHE_DISK_MAX_ENTRIES = int(os.environ.get("EXTRACT_CACHE_DISK_MAX_ENTRIES", 2000))
+EXTRACT_SHARED_CACHE = os.environ.get("EXTRACT_SHARED_CACHE", "")
+
+# DynamoDB items are limited to 400 KB
+DYNAMODB_MAX_TEXT_BYTES = 350 * 1024
+
+
+class MemoryCache:
+    def __init__(self, max_entries=EXTRACT_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class DiskCache:
+    """One JSON file per key; also the local stand-in for the shared tier."""
+
+    def __init__(self, directory=EXTRACT_CACHE_DIR, max_entries=EXTRACT_CACHE_DISK_MAX_ENTRIES):
+        self.directory = directory
+        self.max_entries = max_entries
+        self._puts = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest() + ".json")
+
+    def get(self, key):
+        try:
+            with open(self.path(key)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get("key") == key else None
+
+    def put(self, key, entry):
+        # Write then rename, so concurrent readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, self.path(key))
+        self._puts += 1
+        if self._puts % 100 == 0:
+            self.prune()
+
+    def prune(self):
+        """Remove the least recently written files beyond max_entries."""
+        files = [entry for entry in os.scandir(self.directory) if entry.name.endswith(".json")]
+        if len(files) <= self.max_entries:
+            return
+        files.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in files[: len(files) - self.max_entries]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+
+class DynamoDBCache:
+    """Shared tier in a DynamoDB table with `url` as partition key, holding the cache key."""
+
+    def __init__(self, table_name):
+        import boto3
+
+        self.table = boto3.resource("dynamodb").Table(table_name)
+
+    def get(self, key):
+        item = self.table.get_item(Key={"url": key}).get("Item")
+        if item is None:
+            return None
+        entry = {name: float(value) if name == "fetched_at" else value for name, value in item.items()}
+        entry["key"] = entry.pop("url")
+        return entry
+
+    def put(self, key, entry):
+        if len(entry["text"].encode()) > DYNAMODB_MAX_TEXT_BYTES:
+            return
+        item = {name: value for name, value in entry.items() if value is not None and name != "key"}
+        item["url"] = key
+        item["fetched_at"] = int(entry["fetched_at"])
+        self.table.put_item(Item=item)
+
+
+def create_shared_cache(spec=EXTRACT_SHARED_CACHE):
+    if not spec:
+        return None
+    kind, _, target = spec.partition(":")
+    if kind == "dynamodb":
+        return DynamoDBCache(target)
+    if kind == "dir":
+        return DiskCache(target)
+    raise ValueError(f"Unknown EXTRACT_SHARED_CACHE: {spec}")
+
+
+class ContentCache:
+    def __init__(self, memory=None, disk=None, shared=None, ttl=EXTRACT_CACHE_TTL, variant=""):
+        """
+        Args:
+            memory, disk, shared: The tiers, fastest first; None to leave one out.
+            ttl: Seconds an entry is served without revalidation.
+            variant: The extraction settings, part of every key.
+        """
+        self.ttl = ttl
+        self.variant = variant
+        self.tiers = [tier for tier in (memory, disk, shared) if tier is not None]
+        self.counters = dict.fromkeys(("hit", "miss", "revalidated", "changed", "error"), 0)
+        self._lock = threading.Lock()
+
+    def count(self, counter):
+        with self._lock:
+            self.counters[counter] += 1
+
+    def key(self, url):
+        return f"{self.variant} {url}" if self.variant else url
+
+    def lookup(self, url):
+        """The cached entry for url, or None."""
+        key = self.key(url)
+        for i, tier in enumerate(self.tiers):
+            try:
+                entry = tier.get(key)
+            except Exception as e:
+                print(f"Cache tier {type(tier).__name__} get failed: {e}")
+                self.count("error")
+                continue
+            if entry is not None:
+                for faster in self.tiers[:i]:
+                    try:
+                        faster.put(key, entry)
+                    except Exception as e:
+                        # Still a hit, it just stays out of the faster tier
+                        print(f"Cache tier {type(faster).__name__} put failed: {e}")
+                        self.count("error")
+                return entry
+        return None
+
+    def fresh(self, entry):
+        return time.time() - entry["fetched_at"] < self.ttl
+
+    def store(self, url, text, etag=None, last_modified=None):
+        key = self.key(url)
+        entry = {"key": key, "text": text, "etag": etag, "last_modified": last_modified, "fetched_at": time.time()}
+        for tier in self.tiers:
+            try:
+                tier.put(key, entry)
+            except Exception as e:
+                print(f"Cache tier {type(tier).__name__} put failed: {e}")
+                self.count("error")
+        return entry
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.counters)
+
+
+def conditional_headers(entry):
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def create_content_cache(variant=""):
+    try:
+        disk = DiskCache()
+    except OSError as e:
+        print(f"Disk cache disabled: {e}")
+        disk = None
+    return ContentCache(MemoryCache(), disk, create_shared_cache(), variant=variant)
@@ -0,0 +1,110 @@
+"""
+Decide how to extract a response before its body is downloaded.
+
+reject_early looks only at the headers: media types that can never be
+extracted (images, audio, video, fonts, archives, executables) and bodies
+larger than EXTRACT_MAX_CONTENT_LENGTH are refused before any byte is read.
+sniff then looks at the first chunk: magic bytes win over the declared
+Content-Type, so a PDF served as application/octet-stream goes to the PDF
+extractor and a PNG served as text/html is refused.
+"""
+
+import os
+
+# Bodies announced larger than this are not downloaded at all
+EXTRACT_MAX_CONTENT_LENGTH = int(os.environ.get("EXTRACT_MAX_CONTENT_LENGTH", 50 * 1024 * 1024))
+
+HTML = "html"
+TEXT = "text"
+PDF = "pdf"
+
+HTML_TYPES = frozenset(
+    {"text/html", "application/xhtml+xml", "text/xml", "application/xml", "application/rss+xml", "application/atom+xml"}
+)
+TEXT_TYPES = frozenset({"text/plain", "text/markdown", "text/csv", "application/json"})
+PDF_TYPES = frozenset({"application/pdf", "application/x-pdf"})
+# Served for anything, decided by the first bytes
+GENERIC_TYPES = frozenset({"", "application/octet-stream", "binary/octet-stream", "application/unknown"})
+REJECTED_PREFIXES = ("image/", "audio/", "video/", "font/", "model/")
+REJECTED_TYPES = frozenset(
+    {
+        "application/zip", "application/gzip", "application/x-gzip", "application/x-tar", "application/x-bzip2",
+        "application/x-7z-compressed", "application/vnd.rar", "application/x-rar-compressed", "application/java-archive",
+        "application/x-msdownload", "application/x-executable", "application/vnd.android.package-archive",
+        "application/x-apple-diskimage", "application/wasm", "application/vnd.ms-excel", "application/msword",
+        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+    }
+)  # fmt: skip
+
+MAGIC = (
+    (b"%PDF-", PDF),
+    (b"\x89PNG\r\n\x1a\n", None),
+    (b"\xff\xd8\xff", None),
+    (b"GIF87a", None),
+    (b"GIF89a", None),
+    (b"RIFF", None),
+    (b"PK\x03\x04", None),
+    (b"\x1f\x8b", None),
+    (b"BZh", None),
+    (b"7z\xbc\xaf\x27\x1c", None),
+    (b"Rar!\x1a\x07", None),
+    (b"\x7fELF", None),
+    (b"MZ", None),
+    (b"OggS", None),
+    (b"ID3", None),
+    (b"fLaC", None),
+    (b"wOFF", None),
+    (b"wOF2", None),
+    (b"\x00asm", None),
+    (b"\xd0\xcf\x11\xe0", None),
+)
+
+
+class UnsupportedContent(Exception):
+    """The response cannot be turned into text."""
+
+
+def media_type(content_type):
+    return content_type.split(";", 1)[0].strip().lower()
+
+
+def reject_early(content_type, content_length):
+    """Raise UnsupportedContent when the headers alone rule the response out."""
+    mime = media_type(content_type)
+    if mime.startswith(REJECTED_PREFIXES) or mime in REJECTED_TYPES:
+        raise UnsupportedContent(f"Unsupported content type {mime}")
+    if content_length and content_length.isdigit() and int(content_length) > EXTRACT_MAX_CONTENT_LENGTH:
+        raise UnsupportedContent(f"Content too large ({int(content_length)} bytes)")
+
+
+def looks_binary(head):
+    """Control characters other than whitespace in the first bytes mean it is not text."""
+    sample = head[:1024]
+    if not sample or sample.startswith((b"\xef\xbb\xbf", b"\xfe\xff", b"\xff\xfe")):
+        return False
+    control = sum(1 for byte in sample if byte < 0x20 and byte not in b"\t\n\r\x0c")
+    return control > len(sample) // 20
+
+
+def sniff(content_type, head):
+    """
+    The extractor for a response from its Content-Type and first bytes: HTML, TEXT or PDF.
+    Raises UnsupportedContent for anything else.
+    """
+    mime = media_type(content_type)
+    stripped = head.lstrip()
+    for magic, kind in MAGIC:
+        if stripped.startswith(magic):
+            if kind is None:
+                raise UnsupportedContent(f"Unsupported binary content ({mime or 'no content type'})")
+            return kind
+    if looks_binary(head):
+        raise UnsupportedContent(f"Unsupported binary content ({mime or 'no content type'})")
+    if mime in TEXT_TYPES:
+        return TEXT
+    if mime in HTML_TYPES or mime in GENERIC_TYPES or mime in PDF_TYPES or mime.startswith("text/"):
+        # A PDF type without the PDF signature is usually an HTML error or interstitial page
+        return HTML
+    raise UnsupportedContent(f"Unsupported content type {mime}")
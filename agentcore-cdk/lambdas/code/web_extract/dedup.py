@@ -0,0 +1,178 @@
+"""
+Cross-URL deduplication of web_extract text.
+
+Pages of the same site share headers, "Related posts" lists, author bios
+and legal footers. Every paragraph (line of extracted text) of at least
+MIN_BLOCK_CHARS is fingerprinted: a hash of its normalized text for exact
+repeats and, for prose, a 64-bit simhash of its word 3-shingles for near
+repeats (Hamming distance up to MAX_DISTANCE). A paragraph seen before,
+in an earlier result of the call or, with EXTRACT_DEDUP_SESSION, in an
+earlier call of the same session, is replaced by a back-reference to the
+URL it was first seen in; consecutive repeats share one reference.
+Repeats within one page (code listings, tables) are left alone: a page's
+fingerprints are added only once the whole page has been processed.
+"""
+
+import os
+import re
+import threading
+from collections import OrderedDict
+
+EXTRACT_DEDUP = os.environ.get("EXTRACT_DEDUP", "true").lower() == "true"
+EXTRACT_DEDUP_SESSION = os.environ.get("EXTRACT_DEDUP_SESSION", "false").lower() == "true"
+EXTRACT_DEDUP_MAX_SESSIONS = int(os.environ.get("EXTRACT_DEDUP_MAX_SESSIONS", 64))
+
+MIN_BLOCK_CHARS = 40
+MAX_DISTANCE = 3
+SHINGLE_WORDS = 3
+# 4 bands of 16 bits: two simhashes within MAX_DISTANCE bits share at least one band
+BANDS = 4
+BAND_BITS = 64 // BANDS
+# Near repeats are only looked for in prose: code and table rows that differ
+# by one identifier or number are different content
+NEAR_MIN_WORDS = 12
+CODE_CHARS = frozenset("{}[]()<>=;_$#|\\`")
+MAX_CODE_CHAR_RATIO = 0.03
+
+WORD = re.compile(r"\w+")
+
+
+def normalize(text):
+    return " ".join(WORD.findall(text.lower()))
+
+
+# Bit i of a byte spread to bit 32*i: shingle hashes are summed 64 counters at a time in one int
+LANE_BITS = 32
+MASK64 = (1 << 64) - 1
+_SPREAD = [sum(1 << (LANE_BITS * i) for i in range(8) if byte >> i & 1) for byte in range(256)]
+
+
+def simhash(words):
+    if len(words) < SHINGLE_WORDS:
+        shingles = [" ".join(words)]
+    else:
+        shingles = [" ".join(words[i : i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)]
+    counts = 0
+    for shingle in shingles:
+        # str hashes are salted per process, which is fine: fingerprints never leave the container
+        digest = (hash(shingle) & MASK64).to_bytes(8, "little")
+        for i, byte in enumerate(digest):
+            counts += _SPREAD[byte] << (i * 8 * LANE_BITS)
+    # Bit set where more than half of the shingle hashes have it set
+    half = len(shingles) / 2
+    lane_mask = (1 << LANE_BITS) - 1
+    return sum(1 << bit for bit in range(64) if (counts >> (bit * LANE_BITS)) & lane_mask > half)
+
+
+def is_prose(line, words):
+    if len(words) < NEAR_MIN_WORDS:
+        return False
+    return sum(1 for c in line if c in CODE_CHARS) <= MAX_CODE_CHAR_RATIO * len(line)
+
+
+class Fingerprints:
+    """Paragraph fingerprints seen so far, mapped to the URL they first appeared in."""
+
+    def __init__(self):
+        self.exact = {}
+        self.bands = [{} for _ in range(BANDS)]
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def band_keys(value):
+        return [(value >> (band * BAND_BITS)) & ((1 << BAND_BITS) - 1) for band in range(BANDS)]
+
+    def find(self, value):
+        for band, band_key in zip(self.bands, self.band_keys(value)):
+            for other, other_source in band.get(band_key, ()):
+                if bin(value ^ other).count("1") <= MAX_DISTANCE:
+                    return other_source
+        return None
+
+    def add(self, key, value, source):
+        self.exact.setdefault(key, source)
+        if value is None:
+            return
+        for band, band_key in zip(self.bands, self.band_keys(value)):
+            band.setdefault(band_key, []).append((value, source))
+
+
+def reference(count, source):
+    return f"[{count} paragraph{'s' if count > 1 else ''} repeated from {source}]"
+
+
+def dedupe_text(text, source, fingerprints):
+    """
+    text with paragraphs already in fingerprints replaced by back-references;
+    adds the new ones after the whole text, so a page never references itself.
+    """
+    lines, run, run_source, new = [], 0, None, []
+    for line in text.splitlines():
+        found = None
+        if len(line) >= MIN_BLOCK_CHARS:
+            key = normalize(line)
+            found = fingerprints.exact.get(key)
+            if found is None:
+                words = key.split()
+                value = simhash(words) if is_prose(line, words) else None
+                if value is not None:
+                    found = fingerprints.find(value)
+                if found is None:
+                    new.append((key, value))
+        if found is not None and found == run_source:
+            run += 1
+            continue
+        if run:
+            lines.append(reference(run, run_source))
+        run, run_source = (1, found) if found is not None else (0, None)
+        if found is None:
+            lines.append(line)
+    if run:
+        lines.append(reference(run, run_source))
+    for key, value in new:
+        fingerprints.add(key, value, source)
+    return "\n".join(lines)
+
+
+_sessions = OrderedDict()
+_sessions_lock = threading.Lock()
+
+
+def session_fingerprints(session_id):
+    """Fingerprints kept for a session across calls on this warm container."""
+    with _sessions_lock:
+        fingerprints = _sessions.get(session_id)
+        if fingerprints is None:
+            fingerprints = _sessions[session_id] = Fingerprints()
+        _sessions.move_to_end(session_id)
+        while len(_sessions) > EXTRACT_DEDUP_MAX_SESSIONS:
+            _sessions.popitem(last=False)
+        return fingerprints
+
+
+def dedupe_results(results, session_id=None):
+    """
+    Deduplicate the raw_content of extract results in place.
+
+    Args:
+        results (list[dict]): Extract results with url and raw_content.
+        session_id (str, optional): Also dedupe against earlier calls of this session
+                                    when EXTRACT_DEDUP_SESSION is set.
+
+    Returns:
+        dict: bytes_in and bytes_saved for the call.
+    """
+    if EXTRACT_DEDUP_SESSION and session_id:
+        fingerprints = session_fingerprints(session_id)
+    else:
+        fingerprints = Fingerprints()
+
+    bytes_in = bytes_out = 0
+    with fingerprints.lock:
+        for doc in results:
+            text = doc.get("raw_content") or ""
+            deduped = dedupe_text(text, doc["url"], fingerprints)
+            bytes_in += len(text.encode())
+            bytes_out += len(deduped.encode())
+            doc["raw_content"] = deduped
+    return {"bytes_in": bytes_in, "bytes_saved": bytes_in - bytes_out}
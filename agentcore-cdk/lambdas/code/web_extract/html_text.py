@@ -0,0 +1,241 @@
+"""
+Streaming HTML to text.
+
+Pages are fed to an event parser chunk by chunk as they download, so no
+full document string or tree is built. Text inside script, style, nav and
+similar subtrees is dropped as it streams past. lxml's parser is used when
+the package is available (it is not in the Bs4Requests layer); otherwise
+the standard library's html.parser is used.
+
+With main_content, blocks that look like boilerplate (link lists, short
+fragments away from the article text) are dropped as well.
+"""
+
+import codecs
+from html.parser import HTMLParser
+
+try:
+    from lxml import etree
+
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+# Subtrees whose text never reaches the agent
+SKIP_TAGS = frozenset({"script", "style", "nav", "noscript", "template", "svg", "iframe"})
+# Elements without content or end tag
+VOID_TAGS = frozenset(
+    {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr"}
+)
+# Tags that end a line, so words of adjacent blocks are not glued together
+BLOCK_TAGS = frozenset(
+    {
+        "p", "div", "br", "li", "ul", "ol", "tr", "td", "th", "table", "section", "article", "header",
+        "footer", "aside", "main", "h1", "h2", "h3", "h4", "h5", "h6", "pre", "blockquote", "hr", "title",
+        "dt", "dd", "figcaption",
+    }
+)  # fmt: skip
+HEADING_TAGS = frozenset({"h1", "h2", "h3", "h4", "h5", "h6"})
+
+# Boilerplate removal: blocks that are mostly link text are navigation, blocks of
+# at least MIN_GOOD_WORDS words are content
+MAX_LINK_DENSITY = 0.5
+MIN_GOOD_WORDS = 12
+
+
+class TextCollector:
+    """
+    Parser target keeping the text outside SKIP_TAGS, as a list of blocks
+    (text, link characters, heading) split at BLOCK_TAGS.
+    """
+
+    def __init__(self, main_content=False):
+        self.main_content = main_content
+        self.blocks = []
+        self.parts = []
+        # Open elements, as (tag, counted in skip_depth or link_depth)
+        self.open = []
+        self.skip_depth = 0
+        self.link_depth = 0
+        self.link_chars = 0
+        self.heading = False
+
+    def flush(self):
+        lines = (line.strip() for line in "".join(self.parts).splitlines())
+        text = "\n".join(line for line in lines if line)
+        if text:
+            self.blocks.append((text, self.link_chars, self.heading))
+        self.parts = []
+        self.link_chars = 0
+        self.heading = False
+
+    def start(self, tag, attrib=None):
+        tag = tag.lower()
+        if tag in VOID_TAGS:
+            if tag in BLOCK_TAGS and not self.skip_depth:
+                self.flush()
+            return
+        counted = False
+        if tag in SKIP_TAGS:
+            self.skip_depth += 1
+            counted = True
+        elif self.skip_depth:
+            pass
+        elif tag in BLOCK_TAGS:
+            self.flush()
+            self.heading = tag in HEADING_TAGS
+        elif tag == "a":
+            self.link_depth += 1
+            counted = True
+        self.open.append((tag, counted))
+
+    def end(self, tag):
+        """
+        Close tag and any element left open inside it, as browsers do, so an
+        unclosed <nav> ends with its parent instead of hiding the rest of the page.
+        End tags without a matching open element are ignored.
+        """
+        tag = tag.lower()
+        for i in range(len(self.open) - 1, -1, -1):
+            if self.open[i][0] == tag:
+                break
+        else:
+            return
+        closed, self.open = self.open[i:], self.open[:i]
+        for closed_tag, counted in closed:
+            if closed_tag in SKIP_TAGS:
+                self.skip_depth -= counted
+            elif closed_tag == "a":
+                self.link_depth -= counted
+        if not self.skip_depth and any(closed_tag in BLOCK_TAGS for closed_tag, _ in closed):
+            self.flush()
+
+    def data(self, data):
+        if not self.skip_depth:
+            self.parts.append(data)
+            if self.link_depth:
+                self.link_chars += len(data.strip())
+
+    def comment(self, text):
+        pass
+
+    def close(self):
+        self.flush()
+        blocks = main_content_blocks(self.blocks) if self.main_content else self.blocks
+        return "\n".join(text for text, _, _ in blocks)
+
+
+def classify_block(text, link_chars, heading):
+    if link_chars > MAX_LINK_DENSITY * len(text):
+        return "bad"
+    if heading:
+        return "heading"
+    return "good" if len(text.split()) >= MIN_GOOD_WORDS else "short"
+
+
+def main_content_blocks(blocks):
+    """
+    Boilerplate removal in the style of jusText: link lists are dropped,
+    paragraphs with enough words are kept, and short blocks and headings are
+    kept only next to kept paragraphs (short ones between two, headings before
+    one). Without any long paragraph, everything but link lists is kept.
+    """
+    classes = [classify_block(*block) for block in blocks]
+    if "good" not in classes:
+        kept = [block for block, cls in zip(blocks, classes) if cls != "bad"]
+        return kept or blocks
+
+    def neighbour(i, step):
+        """Class of the nearest block in direction step that is neither short nor a heading."""
+        i += step
+        while 0 <= i < len(classes):
+            if classes[i] in ("good", "bad"):
+                return classes[i]
+            i += step
+        return None
+
+    kept = []
+    for i, (block, cls) in enumerate(zip(blocks, classes)):
+        if cls == "good":
+            kept.append(block)
+        elif cls == "heading" and neighbour(i, 1) == "good":
+            kept.append(block)
+        elif cls == "short" and neighbour(i, -1) == "good" and neighbour(i, 1) == "good":
+            kept.append(block)
+    return kept
+
+
+class _StdlibParser(HTMLParser):
+    """html.parser driving a TextCollector, decoding bytes incrementally."""
+
+    def __init__(self, encoding=None, main_content=False):
+        super().__init__(convert_charrefs=True)
+        self.target = TextCollector(main_content)
+        self.decoder = codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+
+    def handle_starttag(self, tag, attrs):
+        self.target.start(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        # <br/>, <svg/>: an element without a subtree
+        self.target.start(tag)
+        if tag.lower() not in VOID_TAGS:
+            self.target.end(tag)
+
+    def handle_endtag(self, tag):
+        self.target.end(tag)
+
+    def handle_data(self, data):
+        self.target.data(data)
+
+    def feed(self, data):
+        super().feed(self.decoder.decode(data) if isinstance(data, bytes) else data)
+
+    def close(self):
+        super().feed(self.decoder.decode(b"", final=True))
+        super().close()
+        return self.target.close()
+
+
+def create_parser(encoding=None, use_lxml=None, main_content=False):
+    """
+    A parser with feed(chunk) and close() -> text.
+
+    Args:
+        encoding: Charset from the Content-Type header, None to detect it (lxml) or assume UTF-8.
+        use_lxml: Use lxml, by default when it is installed.
+        main_content: Drop boilerplate blocks, see main_content_blocks.
+    """
+    if use_lxml is None:
+        use_lxml = LXML_AVAILABLE
+    if use_lxml:
+        return etree.HTMLParser(target=TextCollector(main_content), encoding=encoding, no_network=True)
+    return _StdlibParser(encoding, main_content)
+
+
+def html_to_text(html, use_lxml=None, main_content=False):
+    parser = create_parser(use_lxml=use_lxml, main_content=main_content)
+    parser.feed(html)
+    return parser.close()
+
+
+def stream_to_text(chunks, max_bytes, encoding=None, use_lxml=None, main_content=False):
+    """
+    Parse an iterable of byte chunks, stopping once max_bytes have been read.
+
+    Returns:
+        tuple: (text, truncated)
+    """
+    parser = create_parser(encoding, use_lxml, main_content)
+    read = 0
+    truncated = False
+    for chunk in chunks:
+        if read + len(chunk) > max_bytes:
+            chunk = chunk[: max_bytes - read]
+            truncated = True
+        read += len(chunk)
+        if chunk:
+            parser.feed(chunk)
+        if truncated:
+            break
+    return parser.close(), truncated
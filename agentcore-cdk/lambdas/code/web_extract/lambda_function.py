@@ -1,5 +1,18 @@
+import os
+import time
+
 from web_extract import web_extract
 
+# Seconds a web_extract call may take, and the time kept back to format and return the results
+EXTRACT_CALL_BUDGET = float(os.environ.get("EXTRACT_CALL_BUDGET", 60))
+DEADLINE_MARGIN = float(os.environ.get("DEADLINE_MARGIN", 2))
+
+
+def call_deadline(context, budget):
+    """time.monotonic() by which the handler should return: the budget, or sooner if the Lambda times out first."""
+    remaining = context.get_remaining_time_in_millis() / 1000 - DEADLINE_MARGIN
+    return time.monotonic() + max(0, min(budget, remaining))
+
 
 def lambda_handler(event: dict, context) -> dict:
     # event: The event schema should match whatever inputSchema you define for the target.
@@ -17,7 +30,10 @@ def lambda_handler(event: dict, context) -> dict:
     results = "no such tool"
 
     if toolName == 'web_extract':
-        results = web_extract( **event)
+        session_id = context.client_context.custom.get('bedrockAgentCoreSessionId')
+        deadline = call_deadline(context, EXTRACT_CALL_BUDGET)
+        # Set by the handler, not by the caller
+        results = web_extract(**{**event, "session_id": session_id, "deadline": deadline})
     else:
         print ("Results:")
 
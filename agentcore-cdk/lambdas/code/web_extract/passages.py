@@ -0,0 +1,162 @@
+"""
+Query-aware passage selection for web_extract results.
+
+Extracted pages are split into passages (a heading is kept with the text
+that follows it), scored against the query with BM25 over all passages of
+the call, and the best ones are kept until the token budget is spent. Kept
+passages are returned per page in their original order, with a marker where
+text was left out. Without a query, or when no passage matches it (a query
+of only stopwords), each page is cut to an equal share of the budget.
+"""
+
+import math
+import re
+from collections import Counter
+
+# Rough token estimate, close enough for budgeting English text
+CHARS_PER_TOKEN = 4
+# Passages are built from consecutive lines up to this many characters
+MAX_PASSAGE_CHARS = 1200
+OMITTED = "[...]"
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+STOPWORDS = frozenset(
+    "a an and are as at be by can do for from how i in is it of on or that the this to what when where which "
+    "with you your".split()
+)
+WORD = re.compile(r"\w+")
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(text):
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def tokenize(text):
+    return [word for word in WORD.findall(text.lower()) if word not in STOPWORDS]
+
+
+def split_long_line(line):
+    """Split a line longer than MAX_PASSAGE_CHARS at sentence ends."""
+    if len(line) <= MAX_PASSAGE_CHARS:
+        return [line]
+    pieces, current = [], ""
+    for sentence in SENTENCE_END.split(line):
+        if current and len(current) + len(sentence) >= MAX_PASSAGE_CHARS:
+            pieces.append(current)
+            current = ""
+        current = f"{current} {sentence}" if current else sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_passages(text):
+    """Group lines into passages of up to MAX_PASSAGE_CHARS, starting a new one after a long line."""
+    passages, current, size = [], [], 0
+    for line in (piece for line in text.splitlines() for piece in split_long_line(line)):
+        if current and size + len(line) > MAX_PASSAGE_CHARS:
+            passages.append("\n".join(current))
+            current, size = [], 0
+        current.append(line)
+        size += len(line) + 1
+        # A long line is a paragraph of its own; short lines (headings, list items) join the next one
+        if len(line) > MAX_PASSAGE_CHARS // 4:
+            passages.append("\n".join(current))
+            current, size = [], 0
+    if current:
+        passages.append("\n".join(current))
+    return passages
+
+
+def bm25_scores(query, passages):
+    terms = set(tokenize(query))
+    documents = [Counter(tokenize(passage)) for passage in passages]
+    if not terms or not documents:
+        return [0.0] * len(passages)
+    average_length = sum(sum(document.values()) for document in documents) / len(documents) or 1
+    document_frequency = Counter(term for document in documents for term in terms if term in document)
+
+    scores = []
+    for document in documents:
+        length = sum(document.values())
+        score = 0.0
+        for term in terms:
+            frequency = document[term]
+            if not frequency:
+                continue
+            n = document_frequency[term]
+            idf = math.log(1 + (len(documents) - n + 0.5) / (n + 0.5))
+            score += idf * frequency * (BM25_K1 + 1) / (
+                frequency + BM25_K1 * (1 - BM25_B + BM25_B * length / average_length)
+            )
+        scores.append(score)
+    return scores
+
+
+def join_selected(passages, selected):
+    """The selected passages in page order, with OMITTED where passages were left out."""
+    parts, previous = [], -1
+    for i in sorted(selected):
+        if i != previous + 1 and not (parts and parts[-1].endswith(OMITTED)):
+            parts.append(OMITTED)
+        parts.append(passages[i])
+        previous = i
+    if previous != len(passages) - 1 and parts and not parts[-1].endswith(OMITTED):
+        parts.append(OMITTED)
+    return "\n".join(parts)
+
+
+def truncate(text, max_tokens):
+    """The start of text within max_tokens, cut at a line break or else a space."""
+    budget = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= budget:
+        return text
+    cut = text.rfind("\n", 0, budget)
+    if cut < budget // 2:
+        cut = text.rfind(" ", 0, budget)
+    return text[: cut if cut > 0 else budget] + "\n" + OMITTED
+
+
+def select_passages(texts, query=None, max_tokens=None):
+    """
+    Trim page texts to the passages that fit in max_tokens.
+
+    Args:
+        texts (list[str]): Extracted text of each page.
+        query (str, optional): Rank passages by BM25 relevance to this text.
+        max_tokens (int, optional): Token budget shared by all pages.
+
+    Returns:
+        list[str]: The trimmed text of each page, in the same order.
+    """
+    if not max_tokens or not texts:
+        return texts
+
+    if not query or not tokenize(query):
+        return [truncate(text, max_tokens // len(texts)) for text in texts]
+
+    pages = [split_passages(text) for text in texts]
+    candidates = [(page, i, passage) for page, passages in enumerate(pages) for i, passage in enumerate(passages)]
+    scores = bm25_scores(query, [passage for _, _, passage in candidates])
+    if not any(score > 0 for score in scores):
+        return [truncate(text, max_tokens // len(texts)) for text in texts]
+
+    selected = [set() for _ in pages]
+    used = 0
+    for score, (page, i, passage) in sorted(zip(scores, candidates), key=lambda item: -item[0]):
+        if score <= 0:
+            break
+        tokens = estimate_tokens(passage)
+        if used + tokens > max_tokens:
+            if used == 0:
+                # The best passage alone is over the budget: keep its start
+                pages[page][i] = truncate(passage, max_tokens)
+                selected[page].add(i)
+                break
+            continue
+        selected[page].add(i)
+        used += tokens
+    return [join_selected(passages, chosen) for passages, chosen in zip(pages, selected)]
@@ -0,0 +1,217 @@
+"""
+Streaming, page-limited text extraction from PDFs.
+
+A PDF's cross-reference table is at the end of the file, so a full parser
+has to download all of it first. This extractor instead scans the bytes as
+they arrive for `stream ... endstream` objects, inflates page content
+streams (FlateDecode or unfiltered), and collects the strings drawn by the
+text operators (Tj, TJ, ', "). Images, fonts and other binary streams are
+skipped. It stops after max_pages content streams with text, or when the
+byte cap is reached, so only the start of a large PDF is downloaded.
+
+Text drawn with simple fonts decodes well. Strings in fonts that need a
+ToUnicode map (CID fonts) fall back to a UTF-16 or Latin-1 guess.
+"""
+
+import re
+import zlib
+
+STREAM_START = re.compile(rb"stream\r?\n")
+ENDSTREAM = b"endstream"
+# Dictionary keys of streams that are not page content
+SKIP_STREAM = re.compile(rb"/Subtype\s*/(Image|Form|Type1C|CIDFontType0C|OpenType|XML)|/Length[123]\b|/Type\s*/(XObject|XRef|ObjStm|Metadata|EmbeddedFile)")
+UNSUPPORTED_FILTER = re.compile(rb"/(DCTDecode|JPXDecode|CCITTFaxDecode|JBIG2Decode|LZWDecode|ASCII85Decode|RunLengthDecode)")
+# Streams are searched for text drawing operators before being tokenized
+TEXT_OPERATOR = re.compile(rb"(\)|>|\])\s*(Tj|TJ|'|\")")
+
+DELIMITERS = b"()<>[]{}/%"
+WHITESPACE = b" \t\r\n\x0c\x00"
+ESCAPES = {ord("n"): 10, ord("r"): 13, ord("t"): 9, ord("b"): 8, ord("f"): 12}
+# A TJ adjustment below this (in thousandths of an em) is a word gap
+TJ_SPACE = -200
+
+
+def decode_string(raw):
+    if raw.startswith(b"\xfe\xff"):
+        return raw[2:].decode("utf-16-be", errors="ignore")
+    if len(raw) >= 2 and raw[0::2].count(0) * 2 >= len(raw) // 2:
+        # Two-byte codes with a zero high byte are usually Unicode
+        return raw.decode("utf-16-be", errors="ignore")
+    return raw.decode("latin-1")
+
+
+def read_literal(data, i):
+    """Parse a (literal string) starting after its '('; returns (bytes, index after ')')."""
+    out, depth = bytearray(), 1
+    while i < len(data):
+        c = data[i]
+        if c == 0x5C:  # backslash
+            i += 1
+            if i >= len(data):
+                break
+            c = data[i]
+            if c in ESCAPES:
+                out.append(ESCAPES[c])
+            elif 0x30 <= c <= 0x37:
+                digits = len(re.match(rb"[0-7]{1,3}", data[i : i + 3]).group())
+                out.append(int(data[i : i + digits], 8) & 0xFF)
+                i += digits - 1
+            elif c in b"\r\n":
+                # Line continuation
+                if c == 0x0D and data[i + 1 : i + 2] == b"\n":
+                    i += 1
+            else:
+                out.append(c)
+        elif c == 0x28:
+            depth += 1
+            out.append(c)
+        elif c == 0x29:
+            depth -= 1
+            if depth == 0:
+                return bytes(out), i + 1
+            out.append(c)
+        else:
+            out.append(c)
+        i += 1
+    return bytes(out), i
+
+
+def content_text(data):
+    """The text drawn by a content stream, one line per text line."""
+    parts, operands, in_array, array = [], [], False, []
+    i, n = 0, len(data)
+    while i < n:
+        c = data[i]
+        if c in WHITESPACE:
+            i += 1
+        elif c == 0x28:  # (
+            raw, i = read_literal(data, i + 1)
+            (array if in_array else operands).append(decode_string(raw))
+        elif c == 0x3C and data[i + 1 : i + 2] != b"<":  # <hex>
+            end = data.find(b">", i)
+            end = n if end < 0 else end
+            hex_digits = re.sub(rb"\s", b"", data[i + 1 : end])
+            if len(hex_digits) % 2:
+                hex_digits += b"0"
+            try:
+                (array if in_array else operands).append(decode_string(bytes.fromhex(hex_digits.decode())))
+            except ValueError:
+                pass
+            i = end + 1
+        elif c == 0x5B:  # [
+            in_array, array = True, []
+            i += 1
+        elif c == 0x5D:  # ]
+            in_array = False
+            operands.append(array)
+            i += 1
+        elif c == 0x25:  # % comment
+            end = data.find(b"\n", i)
+            i = n if end < 0 else end + 1
+        else:
+            start = i
+            while i < n and data[i] not in WHITESPACE and data[i] not in DELIMITERS:
+                i += 1
+            if i == start:
+                i += 1
+                continue
+            token = data[start:i]
+            if in_array:
+                try:
+                    if float(token) < TJ_SPACE:
+                        array.append(" ")
+                except ValueError:
+                    pass
+                continue
+            if token in (b"Tj", b"'", b'"'):
+                if token != b"Tj":
+                    parts.append("\n")
+                parts.extend(operand for operand in operands[-1:] if isinstance(operand, str))
+            elif token == b"TJ":
+                for operand in operands[-1:]:
+                    if isinstance(operand, list):
+                        parts.extend(operand)
+            elif token in (b"T*", b"Td", b"TD", b"ET"):
+                parts.append("\n")
+            elif token == b"Tm":
+                parts.append(" ")
+            if not token[:1].isdigit() and token[:1] not in b"-+.":
+                operands = []
+    lines = (" ".join(line.split()) for line in "".join(parts).splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+class PDFTextStream:
+    """Feed PDF bytes as they arrive; pages holds the text of each content stream with text."""
+
+    def __init__(self, max_pages):
+        self.max_pages = max_pages
+        self.pages = []
+        self.buffer = b""
+        # Inside a stream's data, and how to treat it
+        self.in_stream = False
+        self.skip = False
+        self.flate = False
+
+    @property
+    def done(self):
+        return len(self.pages) >= self.max_pages
+
+    def feed(self, chunk):
+        self.buffer += chunk
+        while not self.done:
+            if not self.in_stream:
+                match = STREAM_START.search(self.buffer)
+                if match is None:
+                    # Keep enough of the tail for a dictionary and a split "stream" keyword
+                    self.buffer = self.buffer[-4096:]
+                    return
+                dictionary = self.buffer[max(0, match.start() - 1024) : match.start()]
+                dictionary = dictionary[dictionary.rfind(b"obj") + 3 :] if b"obj" in dictionary else dictionary
+                self.skip = bool(SKIP_STREAM.search(dictionary) or UNSUPPORTED_FILTER.search(dictionary))
+                self.flate = b"FlateDecode" in dictionary or b"/Fl " in dictionary or b"/Fl]" in dictionary
+                self.buffer = self.buffer[match.end() :]
+                self.in_stream = True
+            end = self.buffer.find(ENDSTREAM)
+            if end < 0:
+                if self.skip:
+                    # Binary stream we do not need: drop all but a possible split "endstream"
+                    self.buffer = self.buffer[-len(ENDSTREAM) :]
+                return
+            data, self.buffer = self.buffer[:end], self.buffer[end + len(ENDSTREAM) :]
+            self.in_stream = False
+            if not self.skip:
+                self.add_stream(data)
+
+    def add_stream(self, data):
+        if self.flate:
+            try:
+                data = zlib.decompressobj().decompress(data)
+            except zlib.error:
+                return
+        if not TEXT_OPERATOR.search(data):
+            return
+        text = content_text(data)
+        if text:
+            self.pages.append(text)
+
+    def close(self):
+        return "\n\n".join(self.pages)
+
+
+def stream_pdf_text(chunks, max_bytes, max_pages):
+    """
+    Extract the text of the first max_pages pages from an iterable of PDF byte chunks.
+
+    Returns:
+        tuple: (text, truncated), truncated when reading stopped at max_bytes or max_pages.
+    """
+    extractor = PDFTextStream(max_pages)
+    read = 0
+    for chunk in chunks:
+        chunk = chunk[: max_bytes - read]
+        read += len(chunk)
+        extractor.feed(chunk)
+        if extractor.done or read >= max_bytes:
+            return extractor.close(), True
+    return extractor.close(), False
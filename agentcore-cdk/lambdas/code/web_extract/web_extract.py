@@ -1,4 +1,12 @@
+import json
+
 from bs4_extract import extract
+from dedup import EXTRACT_DEDUP, dedupe_results
+from passages import select_passages
+
+# Token budget per URL when a query is given without max_tokens
+QUERY_MAX_TOKENS = 2000
+
 
 def format_extract_results_for_agent(tavily_result):
     """
@@ -56,7 +64,9 @@ def format_extract_results_for_agent(tavily_result):
 
     return "\n" + "".join(formatted_results)
 
-def web_extract(urls: str | list[str], include_images: bool = False, extract_depth: str = "basic"
+def web_extract(urls: str | list[str], include_images: bool = False, extract_depth: str = "basic",
+    query: str | None = None, max_tokens: int | None = None, session_id: str | None = None,
+    deadline: float | None = None
 ) -> str:
     """Extract content from one or more web pages using Tavily's extract API.
 
@@ -67,6 +77,13 @@ def web_extract(urls: str | list[str], include_images: bool = False, extract_dep
         extract_depth (str, optional): The depth of extraction. 'basic' provides standard
                                      content extraction, 'advanced' provides more detailed
                                      extraction. Defaults to "basic".
+        query (str, optional): Only keep the passages most relevant to this question (BM25).
+                               Used together with max_tokens, defaults to QUERY_MAX_TOKENS per URL.
+        max_tokens (int, optional): Approximate token budget for the content of all pages.
+                                    Defaults to no limit.
+        session_id (str, optional): Gateway session, for deduplication across calls of a session.
+        deadline (float, optional): time.monotonic() by which to return; pages not extracted by then
+                                    are reported as failed.
 
     Returns:
         str: A formatted string containing the extracted content from each URL, including
@@ -95,7 +112,24 @@ def web_extract(urls: str | list[str], include_images: bool = False, extract_dep
 
             cleaned_urls.append(url)
 
-        api_response = extract(cleaned_urls)
+        api_response = extract(cleaned_urls, deadline)
+
+        # Select passages before deduplicating: a back-reference has no words to
+        # match the query, and the session fingerprints should only hold
+        # paragraphs the agent was actually shown
+        if query and not max_tokens:
+            max_tokens = QUERY_MAX_TOKENS * len(cleaned_urls)
+        if max_tokens:
+            results = api_response["results"]
+            texts = select_passages([doc["raw_content"] for doc in results], query, int(max_tokens))
+            for doc, text in zip(results, texts):
+                if doc["raw_content"] and not text:
+                    text = "[No passages matched the query]" if query else "[Content omitted: token budget used up]"
+                doc["raw_content"] = text
+
+        if EXTRACT_DEDUP:
+            dedup_stats = dedupe_results(api_response["results"], session_id)
+            print(json.dumps({"dedup": dedup_stats}))
 
         # Format the results for the agent
         formatted_results = format_extract_results_for_agent(api_response)
@@ -3,10 +3,11 @@ extract_target = dict(
     description="""Extract content from one or more web pages using Bs4.
 Args:
     urls (str | list[str]): A single URL string or a list of URLs to extract content from.
+    query (str, optional): The question you are researching. Only the passages of the pages most relevant to it are returned.
+    max_tokens (int, optional): Approximate token budget for the content of all pages. Defaults to 2000 per URL with a query, no limit without.
 
 Returns:
-    str: A formatted string containing the extracted content from each URL, including
-        the full raw content, any images found (if requested), and information about any URLs that failed to be processed.
+    str: A formatted string containing the main content of each URL (or its passages most relevant to the query), any images found (if requested), and information about any URLs that failed to be processed.
 """,
     input_schema={
         "properties": {
@@ -15,6 +16,14 @@ Returns:
                 "description": "A single URL string or a list of URLs to extract content from.",
                 "type": "string",
             },
+            "query": {
+                "description": "The question you are researching; only the most relevant passages of the pages are returned.",
+                "type": "string",
+            },
+            "max_tokens": {
+                "description": "Approximate token budget for the content of all pages.",
+                "type": "integer",
+            },
         },
         "required": ["urls"],
         "type": "object",
@@ -27,6 +36,7 @@ aws_blogs_search_target = dict(
 
 Args:
     query (str): The search query to be sent for the blog search.
+    queries (List[str], optional): Additional phrasings of the query (synonyms, sub-topics), up to 5. All queries are searched at once and the results merged without duplicates, ranked by how many queries found each one and how high; each result lists the queries that found it in found_by.
     page (int | 1, optional): specific page to retrieve (each page has 25 results) Valid values: 1-2, Defaults to 1.
     Returns: results (List[dict]): The blog search results, a list of objects",
 """,
@@ -36,6 +46,11 @@ Args:
                 "description": "The search query to be sent for the blog search.",
                 "type": "string",
             },
+            "queries": {
+                "description": "Additional query variants searched in the same call, results are merged and deduplicated.",
+                "type": "array",
+                "items": {"type": "string"},
+            },
             "page": {
                 "description": "The page to return, each page has 25 elements.",
                 "type": "integer",
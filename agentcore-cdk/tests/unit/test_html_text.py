@@ -0,0 +1,21 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "lambdas", "code", "web_extract"))
+
+from html_text import html_to_text
+
+
+def test_missing_head_end_tag():
+    html = "<html><head><title>T</title><body><p>Hello world</p></body></html>"
+    assert html_to_text(html, use_lxml=False) == "T\nHello world"
+
+
+def test_unclosed_nav_ends_with_its_parent():
+    html = "<body><div><nav><a href='/'>Home</a></div><p>Article text</p></body>"
+    assert html_to_text(html, use_lxml=False) == "Article text"
+
+
+def test_head_scripts_and_styles_are_dropped():
+    html = "<head><style>p {}</style><script>var a;</script><meta charset='utf-8'></head><p>Body</p>"
+    assert html_to_text(html, use_lxml=False) == "Body"